@@ -0,0 +1,339 @@
+# audio_prep.py
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+from fake_audio import file_sha256
+
+PREPROCESSED_DIR = Path.home() / ".suno_preprocessed"
+
+DEFAULT_PARAMS = {
+    "threshold_db": -45.0,   # windows quieter than this (dBFS RMS) count as silence
+    "window_ms": 20,
+    "pad_ms": 150,           # silence kept around the playing so attacks aren't clipped
+    "peak_db": -1.0,         # normalized peak level
+    "sample_rate": None,     # resample to this rate (None keeps the input rate)
+    "max_seconds": None,     # shorten to this length, with a short fade-out
+    "output_format": "auto"  # m4a when ffmpeg is available, else wav
+}
+
+FADE_OUT_MS = 50
+
+# AAC bitrate per channel for the m4a output, never above the source's own bitrate
+AAC_BITRATE_PER_CHANNEL = 96000
+
+def decode_audio(path, sample_rate=None, channels=None):
+    """Decode to a float32 (frames, channels) array in [-1, 1]; returns (samples, rate)
+
+    PCM WAV is read directly; anything else (m4a, mp3, ...) goes through ffmpeg.
+    The source's channel count is kept unless channels is given (ffmpeg only).
+    """
+
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        try:
+            return _read_wav(path, sample_rate)
+        except wave.Error:
+            # Float or compressed WAV, let ffmpeg handle it
+            pass
+
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError(f"ffmpeg is required to decode {path.name}")
+
+    # Whatever isn't requested is kept as the source has it, so ask ffprobe what that is
+    source = probe_audio(path) if not (sample_rate and channels) else {}
+    rate = sample_rate or source["sample_rate"]
+    channels = channels or source["channels"]
+    resample_args = ["-ar", str(sample_rate)] if sample_rate else []
+    result = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", str(path), "-f", "f32le", "-acodec", "pcm_f32le",
+         "-ac", str(channels), *resample_args, "-"],
+        capture_output=True, check=True
+    )
+    samples = np.frombuffer(result.stdout, dtype="<f4").reshape(-1, channels)
+    return samples, rate
+
+def probe_audio(path):
+    """Sample rate, channel count and bitrate (bits/s, None when unknown) of the first audio stream"""
+
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        try:
+            with wave.open(str(path), "rb") as wav_file:
+                rate, channels = wav_file.getframerate(), wav_file.getnchannels()
+                return {"sample_rate": rate, "channels": channels,
+                        "bit_rate": rate * channels * wav_file.getsampwidth() * 8}
+        except wave.Error:
+            pass
+
+    if not shutil.which("ffprobe"):
+        raise RuntimeError(f"ffprobe is required to read the audio format of {path.name}")
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries",
+         "stream=sample_rate,channels,bit_rate:format=bit_rate", "-of", "json", str(path)],
+        capture_output=True, text=True, check=True
+    )
+    info = json.loads(result.stdout)
+    stream = info["streams"][0]
+    bit_rate = stream.get("bit_rate") or info.get("format", {}).get("bit_rate")
+    return {
+        "sample_rate": int(stream["sample_rate"]),
+        "channels": int(stream["channels"]),
+        "bit_rate": int(bit_rate) if bit_rate and str(bit_rate).isdigit() else None
+    }
+
+def _read_wav(path, sample_rate=None):
+    with wave.open(str(path), "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        width = wav_file.getsampwidth()
+        rate = wav_file.getframerate()
+        raw = wav_file.readframes(wav_file.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 3:
+        # Sign-extend 24-bit little-endian samples into int32
+        triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+        samples = (np.where(ints & 0x800000, ints - (1 << 24), ints)).astype(np.float32) / (1 << 23)
+    else:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / (1 << 31)
+
+    samples = samples.reshape(-1, channels)
+    if sample_rate and sample_rate != rate:
+        samples = resample(samples, rate, sample_rate)
+        rate = sample_rate
+    return samples, rate
+
+def resample(samples, rate, target_rate):
+    """Linear-interpolation resample of every channel at once"""
+
+    frames = samples.shape[0]
+    target_frames = int(round(frames * target_rate / rate))
+    positions = np.arange(target_frames) * (rate / target_rate)
+    index = np.minimum(positions.astype(np.int64), frames - 1)
+    following = np.minimum(index + 1, frames - 1)
+    fraction = (positions - index)[:, None].astype(np.float32)
+    return samples[index] * (1 - fraction) + samples[following] * fraction
+
+def window_rms_db(samples, rate, window_ms=20):
+    """RMS level in dBFS of consecutive windows of the mono mix"""
+
+    window = max(1, int(rate * window_ms / 1000))
+    mono = samples.mean(axis=1)
+    count = -(-len(mono) // window)
+    padded = np.zeros(count * window, dtype=np.float32)
+    padded[:len(mono)] = mono
+    rms = np.sqrt(np.mean(padded.reshape(count, window) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10)), window
+
+def trim_silence(samples, rate, threshold_db=-45.0, window_ms=20, pad_ms=150):
+    """Cut leading and trailing silence; returns (samples, lead_seconds, tail_seconds)"""
+
+    if not len(samples):
+        return samples, 0.0, 0.0
+
+    levels, window = window_rms_db(samples, rate, window_ms)
+    loud = np.flatnonzero(levels > threshold_db)
+    if not len(loud):
+        # Nothing above the threshold, leave the clip alone rather than emptying it
+        return samples, 0.0, 0.0
+
+    pad = int(rate * pad_ms / 1000)
+    start = max(0, loud[0] * window - pad)
+    end = min(len(samples), (loud[-1] + 1) * window + pad)
+    return samples[start:end], start / rate, (len(samples) - end) / rate
+
+def normalize_peak(samples, peak_db=-1.0):
+    """Scale so the loudest sample sits at peak_db dBFS; returns (samples, gain_db)"""
+
+    peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    if peak == 0.0:
+        return samples, 0.0
+    gain = 10 ** (peak_db / 20) / peak
+    return samples * gain, 20 * np.log10(gain)
+
+def shorten(samples, rate, max_seconds):
+    """Cut to max_seconds with a short linear fade-out so the cut doesn't click"""
+
+    limit = int(rate * max_seconds)
+    if len(samples) <= limit:
+        return samples
+    samples = samples[:limit].copy()
+    fade = min(limit, int(rate * FADE_OUT_MS / 1000))
+    samples[limit - fade:] *= np.linspace(1.0, 0.0, fade, dtype=np.float32)[:, None]
+    return samples
+
+def _output_format(output_format):
+    if output_format == "auto":
+        return "m4a" if shutil.which("ffmpeg") else "wav"
+    return output_format
+
+def encode_audio(path, samples, rate, output_format="wav", bit_rate=None):
+    """Write samples as 16-bit WAV or (through ffmpeg) AAC/FLAC, atomically
+
+    AAC is encoded at AAC_BITRATE_PER_CHANNEL, capped at bit_rate when given.
+    """
+
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.stem}.tmp{path.suffix}")
+
+    if output_format == "wav":
+        from wav_synth import write_wav_blocks
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+        write_wav_blocks(tmp_path, [pcm.tobytes()], rate, samples.shape[1])
+    else:
+        aac_rate = AAC_BITRATE_PER_CHANNEL * samples.shape[1]
+        if bit_rate:
+            aac_rate = min(aac_rate, bit_rate)
+        codec = ["-c:a", "aac", "-b:a", str(aac_rate)] if output_format == "m4a" else ["-c:a", "flac"]
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "f32le", "-ar", str(rate), "-ac", str(samples.shape[1]),
+             "-i", "-", *codec, str(tmp_path)],
+            input=np.ascontiguousarray(samples, dtype="<f4").tobytes(), check=True
+        )
+
+    os.replace(tmp_path, path)
+    return str(path)
+
+def output_path(input_path, params, cache_dir=PREPROCESSED_DIR):
+    """Cache path for input_path under params, keyed by content hash and parameters"""
+
+    params = {**DEFAULT_PARAMS, **params, "output_format": _output_format(params.get("output_format", "auto"))}
+    key = hashlib.sha256(
+        (file_sha256(input_path) + json.dumps(params, sort_keys=True)).encode()
+    ).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(input_path).stem}-{key}.{params['output_format']}"
+
+def preprocess_file(input_path, cache_dir=PREPROCESSED_DIR, **params):
+    """Decode, trim, normalize and optionally resample/shorten one file (runs in a worker process)
+
+    Returns per-file stats; an unchanged input with unchanged parameters is
+    answered from the cache without decoding. When the result is not smaller
+    than the input, "output" is the input itself, so uploads never grow.
+    """
+
+    started = time.perf_counter()
+    params = {**DEFAULT_PARAMS, **params}
+    output_format = _output_format(params["output_format"])
+    out_path = output_path(input_path, params, cache_dir)
+
+    stats = {
+        "input": str(input_path),
+        "output": str(out_path),
+        "input_bytes": os.path.getsize(input_path),
+        "cached": out_path.exists()
+    }
+    if not stats["cached"]:
+        samples, rate = decode_audio(input_path, params["sample_rate"])
+        input_seconds = len(samples) / rate
+
+        samples, lead, tail = trim_silence(
+            samples, rate, params["threshold_db"], params["window_ms"], params["pad_ms"]
+        )
+        if params["max_seconds"]:
+            samples = shorten(samples, rate, params["max_seconds"])
+        samples, gain_db = normalize_peak(samples, params["peak_db"])
+
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        bit_rate = probe_audio(input_path)["bit_rate"] if output_format == "m4a" else None
+        encode_audio(out_path, samples, rate, output_format, bit_rate)
+        stats.update(
+            input_seconds=round(input_seconds, 2),
+            output_seconds=round(len(samples) / rate, 2),
+            trimmed_lead_seconds=round(lead, 2),
+            trimmed_tail_seconds=round(tail, 2),
+            gain_db=round(gain_db, 1)
+        )
+
+    stats["output_bytes"] = out_path.stat().st_size
+    stats["kept_original"] = stats["output_bytes"] >= stats["input_bytes"]
+    if stats["kept_original"]:
+        stats.update(output=str(input_path), output_bytes=stats["input_bytes"])
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+def _print_file_stats(stats):
+    reduction = 1 - stats["output_bytes"] / stats["input_bytes"] if stats["input_bytes"] else 0.0
+    if stats["cached"]:
+        detail = "cached"
+    else:
+        detail = (f"{stats['input_seconds']}s → {stats['output_seconds']}s "
+                  f"(-{stats['trimmed_lead_seconds']}s lead, -{stats['trimmed_tail_seconds']}s tail), "
+                  f"{stats['gain_db']:+.1f}dB")
+    if stats["kept_original"]:
+        detail += ", not smaller so the original is kept"
+    print(f"   🎚️ {Path(stats['input']).name}: {detail}, "
+          f"{stats['input_bytes'] / 1e6:.2f}MB → {stats['output_bytes'] / 1e6:.2f}MB "
+          f"({reduction * 100:.0f}% smaller) in {stats['seconds']}s")
+
+def preprocess_audio(input_path, cache_dir=PREPROCESSED_DIR, **params):
+    """Preprocess one file in-process and return the path to upload"""
+
+    stats = preprocess_file(input_path, cache_dir, **params)
+    _print_file_stats(stats)
+    return stats["output"]
+
+def preprocess_batch(input_paths, workers=None, cache_dir=PREPROCESSED_DIR, **params):
+    """Preprocess files across a process pool; returns {input: stats} and prints totals"""
+
+    started = time.perf_counter()
+    results = {}
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(preprocess_file, str(path), str(cache_dir), **params): path for path in input_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ {Path(path).name}: {type(e).__name__}: {e}")
+                continue
+            results[str(path)] = stats
+            _print_file_stats(stats)
+
+    elapsed = time.perf_counter() - started
+    input_bytes = sum(stats["input_bytes"] for stats in results.values())
+    output_bytes = sum(stats["output_bytes"] for stats in results.values())
+    cached = sum(stats["cached"] for stats in results.values())
+    print(
+        f"✅ Preprocessed {len(results)} file(s) ({cached} cached, {failed} failed) in {elapsed:.2f}s, "
+        f"{input_bytes / 1e6:.1f}MB → {output_bytes / 1e6:.1f}MB"
+    )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim, normalize and shrink recordings before uploading to Suno")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threshold-db", type=float, default=DEFAULT_PARAMS["threshold_db"])
+    parser.add_argument("--peak-db", type=float, default=DEFAULT_PARAMS["peak_db"])
+    parser.add_argument("--sample-rate", type=int, default=None)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--format", choices=["auto", "wav", "m4a", "flac"], default="auto")
+    parser.add_argument("--out", default=str(PREPROCESSED_DIR))
+    args = parser.parse_args()
+
+    preprocess_batch(
+        args.files,
+        workers=args.workers,
+        cache_dir=args.out,
+        threshold_db=args.threshold_db,
+        peak_db=args.peak_db,
+        sample_rate=args.sample_rate,
+        max_seconds=args.max_seconds,
+        output_format=args.format
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,51 @@
 # guitar_record_automation.py
 import asyncio
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 from browser_use import Agent
-from browser_use.llm import ChatOpenAI
+from llm_client import get_llm, print_llm_stats, warm_llm_connection
+from suno_session import agent_browser_kwargs, open_suno_session, close_suno_session, print_step_timings
+from control_worker import WarmControlWorker
+from precise_recording import locate_recording_controls, timed_recording
+from selector_cache import SelectorCache, cached_action, resolve_intents, run_cached_steps
+from trajectory_replay import run_with_replay
+from fake_audio import fake_audio_browser_args, fake_audio_clip_from_env
+from generation_waiter import DONE_STATUSES, GenerationWaiter, print_finished_clips
+from track_downloader import ARCHIVE_DIR, append_manifest, download_tracks
+from tracing import traced, run_traced, record_phase
+from prompt_budget import task_prompt, budget_agent_kwargs
 
 load_dotenv()
 
-async def start_guitar_recording(extension_prompt="add drums and bass"):
-    """Start recording guitar directly in Suno"""
+# Appended to the extension prompt for best-of-N variants
+PROMPT_VARIATIONS = [
+    "", "tight groove", "laid-back feel", "high energy", "warm analog production",
+    "sparse arrangement", "big room sound", "live band feel"
+]
+
+@traced("start_guitar_recording")
+async def start_guitar_recording(extension_prompt="add drums and bass", browser_session=None, selector_cache=None, replay=True):
+    """Start recording guitar directly in Suno
+
+    With replay, a recorded trajectory of this task is replayed before
+    falling back to the LLM.
+    """
     
     profile_dir = str(Path.home() / ".suno_browser_profile")
     
+    if browser_session is not None and selector_cache is not None:
+        print("🎸 Setting up recording interface (cached selectors)...")
+        result = await cached_action(browser_session, selector_cache, "record_mode_button")
+        # The click alone doesn't prove the recording interface opened; confirm the red button is visible
+        if result and not await resolve_intents(browser_session, selector_cache, ["red_record_button"]):
+            print("Setup result:", result)
+            return result
+        print("⚠️ Recording interface not visible after the cached click, asking the agent")
+    
     agent = Agent(
-        task=f"""
+        task=task_prompt("setup_recording", f"""
         I want to set up guitar recording in Suno:
         
         1. Go to suno.com/create (I should already be logged in)
@@ -25,31 +56,52 @@ async def start_guitar_recording(extension_prompt="add drums and bass"):
         6. Don't start recording yet - just get to the recording interface
         
         Report when you can see the recording interface with the red record button.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.2,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ),
-        browser_session_config={
-            "user_data_dir": profile_dir,
-            "headless": False
-        }
+        """),
+        llm=get_llm(temperature=0.2),
+        **agent_browser_kwargs(profile_dir, browser_session),
+        **budget_agent_kwargs()
     )
     
     print("🎸 Setting up recording interface...")
-    result = await agent.run()
+    result = await run_with_replay(agent, replay=replay)
     print("Setup result:", result)
     
     return result
 
-async def record_guitar_session(duration_seconds=30):
-    """Record a guitar session for specified duration"""
+@traced("record_guitar_session")
+async def record_guitar_session(duration_seconds=30, browser_session=None, precise_timing=False, selector_cache=None,
+                                controls=None):
+    """Record a guitar session for specified duration
+
+    With precise_timing (needs a shared browser_session) the agent only
+    locates the record/stop controls; start and stop are scheduled clicks,
+    followed by any "next"/"continue" button through the selector cache.
+    controls already located by prepare_post_setup() skip that lookup.
+    """
     
     profile_dir = str(Path.home() / ".suno_browser_profile")
     
+    if precise_timing and browser_session is not None:
+        if controls is None:
+            print("🎯 Locating record and stop controls...")
+            controls = await locate_recording_controls(browser_session, selector_cache)
+        
+        print(f"🔴 Starting {duration_seconds}-second recording session...")
+        print("🎸 Get ready to play your guitar!")
+        take = await timed_recording(browser_session, controls, duration_seconds)
+        print("Recording result:", take)
+        
+        # The agent path's last step: later steps expect the page after any next/continue
+        if not await cached_action(browser_session, selector_cache or SelectorCache(), "next_button"):
+            print("⚠️ Could not get past the recording, the next step may not find its fields")
+        
+        return take
+    
+    if precise_timing:
+        print("⚠️ Precise timing needs a shared browser session, falling back to agent timing")
+    
     agent = Agent(
-        task=f"""
+        task=task_prompt("record_session", f"""
         Record a guitar session:
         
         1. I should see the recording interface with the red record button
@@ -61,33 +113,27 @@ async def record_guitar_session(duration_seconds=30):
         7. Look for any "next" or "continue" buttons to proceed
         
         Be precise with timing and confirm each step.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ),
-        browser_session_config={
-            "user_data_dir": profile_dir,
-            "headless": False
-        }
+        """, duration_seconds=duration_seconds),
+        llm=get_llm(temperature=0.1),
+        **agent_browser_kwargs(profile_dir, browser_session),
+        **budget_agent_kwargs()
     )
     
     print(f"🔴 Starting {duration_seconds}-second recording session...")
     print("🎸 Get ready to play your guitar!")
     
-    result = await agent.run()
+    result = await run_traced(agent)
     print("Recording result:", result)
     
     return result
 
-async def set_extension_prompt_and_generate(extension_prompt="add drums and bass"):
-    """Set the extension prompt and generate"""
+def build_extension_agent(extension_prompt="add drums and bass", browser_session=None):
+    """The prompt-and-generate agent, built ahead of time so it can run as soon as recording stops"""
     
     profile_dir = str(Path.home() / ".suno_browser_profile")
     
-    agent = Agent(
-        task=f"""
+    return Agent(
+        task=task_prompt("extension", f"""
         Set up the AI extension for my guitar recording:
         
         1. I should now see options after recording (prompt field, settings, etc.)
@@ -98,109 +144,374 @@ async def set_extension_prompt_and_generate(extension_prompt="add drums and bass
         6. Report when the AI is processing my guitar recording
         
         Take your time to find the right fields and buttons.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.2,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ),
-        browser_session_config={
-            "user_data_dir": profile_dir,
-            "headless": False
-        }
+        """, extension_prompt=extension_prompt),
+        llm=get_llm(temperature=0.2),
+        **agent_browser_kwargs(profile_dir, browser_session),
+        **budget_agent_kwargs()
     )
+
+@traced("set_extension_prompt_and_generate")
+async def set_extension_prompt_and_generate(extension_prompt="add drums and bass", browser_session=None, selector_cache=None,
+                                            agent=None):
+    """Set the extension prompt and generate (agent: one prepared by build_extension_agent)"""
+    
+    if browser_session is not None and selector_cache is not None:
+        print(f"🎵 Setting extension prompt: '{extension_prompt}' (cached selectors)")
+        print("🚀 Starting AI generation...")
+        result = await run_cached_steps(browser_session, selector_cache, [
+            ("instrumental_toggle", "check", None),
+            ("prompt_field", "fill", f"Extend this guitar recording: {extension_prompt}"),
+            ("generate_button", "click", None)
+        ])
+        print("Generation result:", result)
+        return result
+    
+    if agent is None:
+        agent = build_extension_agent(extension_prompt, browser_session)
     
     print(f"🎵 Setting extension prompt: '{extension_prompt}'")
     print("🚀 Starting AI generation...")
     
-    result = await agent.run()
+    result = await run_traced(agent)
     print("Generation result:", result)
     
     return result
 
-async def live_guitar_jam_session(duration=30, prompt="add rock drums and bass"):
-    """Complete live guitar jam session"""
+def prompt_variants(prompt, count):
+    """count distinct variations of an extension prompt, the plain prompt first"""
+    
+    variations = [PROMPT_VARIATIONS[i % len(PROMPT_VARIATIONS)] for i in range(count)]
+    return [f"{prompt}, {variation}" if variation else prompt for variation in variations]
+
+@traced("generate_best_of_n")
+async def generate_best_of_n(prompt, browser_session, selector_cache=None, variants=3, top_k=1, input_clip=None,
+                             archive_dir=ARCHIVE_DIR):
+    """Submit prompt variants for the same recording and keep the top_k results
+
+    All finished clips are downloaded and ranked locally against input_clip
+    (tempo and key agreement, loudness, opening similarity); the rest are
+    moved to the archive's rejected/ folder. The variants are submitted
+    from the tab holding the recording; a new tab (multi_tab) would open
+    without it.
+    """
+    
+    from clip_scoring import keep_top_k, print_ranking, rank_candidates
+    
+    # Each generation yields two clips
+    waiter = await GenerationWaiter(browser_session, expected_clips=2 * variants).start()
+    for variant in prompt_variants(prompt, variants):
+        print(f"🎵 Submitting variant: {variant}")
+        await set_extension_prompt_and_generate(variant, browser_session=browser_session, selector_cache=selector_cache)
+    
+    print(f"\n⏳ Waiting for {2 * variants} clips...")
+    try:
+        clips = await waiter.wait(timeout=600 + 120 * variants)
+    except (asyncio.TimeoutError, RuntimeError) as e:
+        # A failed or slow variant shouldn't cost the ones that did finish
+        clips = [clip for clip in waiter.clips.values() if clip["status"] in DONE_STATUSES]
+        print(f"❌ Not every variant finished: {e}")
+        if not clips:
+            return []
+        print(f"🎯 Ranking the {len(clips)} clip(s) that did finish")
+    print_finished_clips(clips, waiter.elapsed())
+    
+    records = await download_tracks(
+        browser_session, clips, prompt=prompt, input_clip=input_clip, archive_dir=archive_dir, manifest=False
+    )
+    if not records:
+        return []
+    
+    started = time.perf_counter()
+    ranking = await asyncio.to_thread(rank_candidates, [record["file"] for record in records], input_clip, top_k)
+    downloaded = {record["file"]: record for record in records}
+    originals = [entry["file"] for entry in ranking]
+    kept = keep_top_k(ranking, Path(archive_dir) / "rejected")
+    print_ranking(ranking)
+    print(f"🏆 Scored {len(ranking)} clip(s) in {time.perf_counter() - started:.1f}s, kept {len(kept)}")
+    
+    # Written once, after rejected files were moved, so every record points at where its file is now
+    for original, entry in zip(originals, ranking):
+        downloaded[original].update(file=entry["file"], score=entry["score"], kept=entry["kept"])
+    append_manifest(archive_dir, records + [
+        {"best_of": variants, "prompt": prompt, "input_clip": input_clip, "ranking": ranking}
+    ])
+    return kept
+
+@traced("prepare_post_setup")
+async def prepare_post_setup(prompt, browser_session=None, selector_cache=None, precise_timing=True):
+    """Speculative work for the steps after the human wait
+
+    Warms the LLM connection and, on a shared session, locates the record
+    and stop buttons. The generate step's elements only appear once the
+    recording stops, so they are left to the selector cache then. Without
+    a shared session the prompt-and-generate agent is built instead.
+    Returns what was prepared; anything that fails is left for the normal
+    path to redo.
+    """
+    
+    prepared = {"controls": None, "extension_agent": None}
+    await warm_llm_connection()
+    
+    if browser_session is None:
+        prepared["extension_agent"] = build_extension_agent(prompt)
+        return prepared
+    
+    if precise_timing:
+        try:
+            prepared["controls"] = await locate_recording_controls(browser_session, selector_cache)
+        except RuntimeError as e:
+            print(f"⚠️ Could not locate the recording controls ahead of time: {e}")
+    return prepared
+
+async def overlap_human_wait(message, speculative):
+    """Run speculative() while waiting for Enter off the event loop
+
+    Returns (result, hidden_seconds): the part of the speculative work that
+    finished while the human was still getting ready. With message None
+    there is no wait and nothing is hidden.
+    """
+    
+    timing = {}
+    
+    async def timed():
+        started = time.perf_counter()
+        try:
+            return await speculative()
+        finally:
+            timing["work"] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    task = asyncio.create_task(timed())
+    waited = 0.0
+    if message is not None:
+        await asyncio.to_thread(input, message)
+        waited = time.perf_counter() - started
+        if not task.done():
+            print("⏳ Finishing preparation for the next steps...")
+    
+    try:
+        result = await task
+    except Exception as e:
+        print(f"⚠️ Preparation failed ({type(e).__name__}: {e}), continuing without it")
+        result = None
+    return result, min(timing.get("work", 0.0), waited)
+
+@traced("live_guitar_jam_session")
+async def live_guitar_jam_session(duration=30, prompt="add rock drums and bass", reuse_session=True, precise_timing=True,
+                                  wait_for_completion=True, best_of=1, keep_top=1):
+    """Complete live guitar jam session
+
+    With reuse_session, one browser (and the open suno.com/create tab) is
+    shared by every step instead of launching a new browser per agent.
+    precise_timing records with scheduled clicks instead of LLM waits.
+    Shared sessions also use the on-disk selector cache for known controls
+    and, with wait_for_completion, wait for the finished clips without LLM calls.
+    While waiting for the player to press Enter, the later steps are
+    prepared in the background (prepare_post_setup).
+    best_of > 1 (shared sessions only) generates that many prompt variants
+    and keeps the keep_top best-scoring clips.
+    """
+    
+    profile_dir = str(Path.home() / ".suno_browser_profile")
     
     print("🎸 Live Guitar Jam Session with AI")
     print("=" * 40)
     print(f"📝 Extension prompt: {prompt}")
     print(f"⏱️  Recording duration: {duration} seconds")
     
-    # Step 1: Setup recording interface
-    print("\n🔧 Step 1: Setting up recording...")
-    setup_result = await start_guitar_recording()
+    browser_session = None
+    selector_cache = None
+    cold_start = None
+    step_timings = {}
+    hidden_seconds = 0.0
     
-    input("\n🎸 Recording interface ready! Press Enter when you're ready to record...")
+    # SUNO_FAKE_AUDIO feeds a clip as the microphone, so the jam can run headless and unattended
+    fake_clip = fake_audio_clip_from_env()
+    if fake_clip:
+        print(f"🎧 Fake microphone audio: {fake_clip}")
     
-    # Step 2: Record guitar
-    print(f"\n🔴 Step 2: Recording for {duration} seconds...")
-    record_result = await record_guitar_session(duration)
+    if reuse_session:
+        print("\n🌐 Opening shared browser session...")
+        browser_session, cold_start = await open_suno_session(
+            profile_dir,
+            headless=fake_clip is not None,
+            browser_args=fake_audio_browser_args(fake_clip) if fake_clip else None
+        )
+        selector_cache = SelectorCache()
     
-    # Step 3: Set prompt and generate
-    print("\n🎵 Step 3: Setting up AI extension...")
-    generate_result = await set_extension_prompt_and_generate(prompt)
+    try:
+        # Step 1: Setup recording interface
+        print("\n🔧 Step 1: Setting up recording...")
+        step_start = time.perf_counter()
+        setup_result = await start_guitar_recording(browser_session=browser_session, selector_cache=selector_cache)
+        step_timings["Setup"] = time.perf_counter() - step_start
+        
+        # Prepare the next steps while the player gets ready; with fake audio nobody waits, so nothing to hide
+        prepared = {}
+        if not fake_clip:
+            prepared, hidden_seconds = await overlap_human_wait(
+                "\n🎸 Recording interface ready! Press Enter when you're ready to record...",
+                lambda: prepare_post_setup(prompt, browser_session, selector_cache, precise_timing)
+            )
+            prepared = prepared or {}
+            record_phase("prepared_during_wait", hidden_seconds)
+        
+        # Step 2: Record guitar
+        print(f"\n🔴 Step 2: Recording for {duration} seconds...")
+        step_start = time.perf_counter()
+        record_result = await record_guitar_session(
+            duration, browser_session=browser_session, precise_timing=precise_timing, selector_cache=selector_cache,
+            controls=prepared.get("controls")
+        )
+        step_timings["Record"] = time.perf_counter() - step_start
+        
+        if browser_session is not None and best_of > 1:
+            print(f"\n🎵 Step 3: Generating {best_of} variants, keeping the best {keep_top}...")
+            step_start = time.perf_counter()
+            await generate_best_of_n(
+                prompt, browser_session, selector_cache, variants=best_of, top_k=keep_top, input_clip=fake_clip
+            )
+            step_timings["Best-of-N"] = time.perf_counter() - step_start
+        else:
+            # Step 3: Set prompt and generate
+            print("\n🎵 Step 3: Setting up AI extension...")
+            waiter = None
+            if browser_session is not None and wait_for_completion:
+                # Listen before clicking generate so the generate API response is seen
+                waiter = await GenerationWaiter(browser_session).start()
+            step_start = time.perf_counter()
+            generate_result = await set_extension_prompt_and_generate(
+                prompt, browser_session=browser_session, selector_cache=selector_cache,
+                agent=prepared.get("extension_agent")
+            )
+            step_timings["Generate"] = time.perf_counter() - step_start
+            
+            if waiter is not None:
+                print("\n⏳ Waiting for the generation to finish...")
+                step_start = time.perf_counter()
+                try:
+                    clips = await waiter.wait()
+                except (asyncio.TimeoutError, RuntimeError) as e:
+                    # The generation was submitted, keep the session's timings and stats
+                    clips = None
+                    print(f"❌ Generation did not finish: {e}")
+                step_timings["Generation wait"] = time.perf_counter() - step_start
+                record_phase("generation_wait", step_timings["Generation wait"])
+                
+                if clips:
+                    print_finished_clips(clips, waiter.elapsed())
+                    step_start = time.perf_counter()
+                    await download_tracks(browser_session, clips, prompt=prompt, input_clip=fake_clip)
+                    step_timings["Download"] = time.perf_counter() - step_start
+                    record_phase("download", step_timings["Download"])
+    finally:
+        await close_suno_session(browser_session)
+    
+    print_step_timings(step_timings, cold_start)
+    if hidden_seconds:
+        print(f"🫥 Hidden behind the wait for Enter: {hidden_seconds:.1f}s of preparation")
+    if selector_cache is not None:
+        selector_cache.print_stats()
+    print_llm_stats()
     
-    print("\n🎉 Guitar jam session started!")
-    print("⏳ AI is now extending your guitar with backing instruments...")
-    print("🎵 Check Suno for your completed track in a few minutes!")
+    if browser_session is None or not wait_for_completion:
+        print("\n🎉 Guitar jam session started!")
+        print("⏳ AI is now extending your guitar with backing instruments...")
+        print("🎵 Check Suno for your completed track in a few minutes!")
 
 async def manual_control_session():
-    """Manual control - you tell the AI when to start/stop"""
+    """Manual control - you tell the AI when to start/stop
+
+    Commands run on a warm browser kept open by WarmControlWorker, so
+    pressing "Stop" costs agent steps only, not a browser launch.
+    """
     
     profile_dir = str(Path.home() / ".suno_browser_profile")
     
     print("🎸 Manual Guitar Recording Session")
     print("=" * 35)
     
-    # Setup
-    await start_guitar_recording()
+    fake_clip = fake_audio_clip_from_env()
+    worker = WarmControlWorker(
+        profile_dir,
+        headless=fake_clip is not None,
+        browser_args=fake_audio_browser_args(fake_clip) if fake_clip else None
+    )
+    await worker.start()
     
-    while True:
-        action = input("""
+    waiter = None
+    
+    try:
+        # Setup
+        await worker.submit("setup", lambda session: start_guitar_recording(browser_session=session))
+        
+        while True:
+            # Read the menu off the event loop so the warm browser stays responsive
+            action = await asyncio.to_thread(input, """
 🎛️  What do you want to do?
 1. Start recording
 2. Stop recording  
 3. Set extension prompt and generate
 4. Check status
-5. Exit
+5. Wait for generation to finish (no AI calls)
+6. Exit
 
 Choice: """)
-        
-        if action == "1":
-            agent = Agent(
-                task="Click the red record button to start recording. Tell me when recording has started.",
-                llm=ChatOpenAI(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY")),
-                browser_session_config={"user_data_dir": profile_dir, "headless": False}
-            )
-            result = await agent.run()
-            print("🔴 Recording started:", result)
-            
-        elif action == "2":
-            agent = Agent(
-                task="Stop the current recording. Click the stop button and tell me when recording has stopped.",
-                llm=ChatOpenAI(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY")),
-                browser_session_config={"user_data_dir": profile_dir, "headless": False}
-            )
-            result = await agent.run()
-            print("⏹️ Recording stopped:", result)
-            
-        elif action == "3":
-            prompt = input("🎵 Extension prompt: ") or "add drums and bass"
-            await set_extension_prompt_and_generate(prompt)
             
-        elif action == "4":
-            agent = Agent(
-                task="Check the current status - is anything recording, generating, or completed?",
-                llm=ChatOpenAI(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY")),
-                browser_session_config={"user_data_dir": profile_dir, "headless": False}
-            )
-            result = await agent.run()
-            print("📊 Status:", result)
-            
-        elif action == "5":
-            break
-        else:
-            print("Invalid choice")
+            if action == "1":
+                result = await worker.run_task(
+                    "start",
+                    "Click the red record button to start recording. Tell me when recording has started."
+                )
+                print("🔴 Recording started:", result)
+                print(f"⚡ Latency: {worker.last_latency('start'):.1f}s")
+                
+            elif action == "2":
+                result = await worker.run_task(
+                    "stop",
+                    "Stop the current recording. Click the stop button and tell me when recording has stopped."
+                )
+                print("⏹️ Recording stopped:", result)
+                print(f"⚡ Latency: {worker.last_latency('stop'):.1f}s")
+                
+            elif action == "3":
+                prompt = await asyncio.to_thread(input, "🎵 Extension prompt: ") or "add drums and bass"
+                waiter = await GenerationWaiter(worker.browser_session).start()
+                await worker.submit(
+                    "generate",
+                    lambda session: set_extension_prompt_and_generate(prompt, browser_session=session)
+                )
+                
+            elif action == "4":
+                result = await worker.run_task(
+                    "status",
+                    "Check the current status - is anything recording, generating, or completed?"
+                )
+                print("📊 Status:", result)
+                print(f"⚡ Latency: {worker.last_latency('status'):.1f}s")
+                
+            elif action == "5":
+                if waiter is None:
+                    print("Nothing is generating yet - use option 3 first")
+                    continue
+                try:
+                    clips = await waiter.wait()
+                    print_finished_clips(clips, waiter.elapsed())
+                    await download_tracks(worker.browser_session, clips, prompt=prompt)
+                except asyncio.TimeoutError as e:
+                    print(f"⏳ {e}")
+                except RuntimeError as e:
+                    print(f"❌ {e}")
+                waiter = None
+                
+            elif action == "6":
+                break
+            else:
+                print("Invalid choice")
+    finally:
+        await worker.stop()
+        worker.print_latencies()
+        print_llm_stats()
 
 async def main():
     if not os.getenv("OPENAI_API_KEY"):
@@ -0,0 +1,236 @@
+# batch_jobs.py
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from browser_use import Agent
+from llm_client import get_llm, print_llm_stats
+from suno_session import open_suno_session, close_suno_session
+from upload_cache import UploadIndex, UploadWatcher, clip_id_from_history
+from audio_prep import preprocess_batch
+from tracing import traced, run_traced
+from prompt_budget import task_prompt, budget_agent_kwargs
+
+load_dotenv()
+
+LOGGED_IN_PROFILE = Path.home() / ".suno_browser_profile"
+WORKER_PROFILES_DIR = Path.home() / ".suno_batch_profiles"
+
+def load_jobs(jobs_path):
+    """Read (audio, prompt, instrumental) jobs from a JSONL file, giving each a stable id"""
+
+    jobs = []
+    with open(jobs_path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            job = json.loads(line)
+            if "audio" not in job or "prompt" not in job:
+                raise ValueError(f"{jobs_path}:{line_number}: a job needs 'audio' and 'prompt'")
+            job.setdefault("instrumental", True)
+            if "id" not in job:
+                key = json.dumps([job["audio"], job["prompt"], job["instrumental"]])
+                job["id"] = hashlib.sha256(key.encode()).hexdigest()[:12]
+            jobs.append(job)
+    return jobs
+
+def checkpoint_path(jobs_path):
+    return Path(jobs_path).with_suffix(".done.jsonl")
+
+def load_completed(jobs_path):
+    """Ids of jobs already checkpointed as done"""
+
+    path = checkpoint_path(jobs_path)
+    if not path.exists():
+        return set()
+
+    completed = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a truncated last line
+                continue
+            if record.get("status") == "done":
+                completed.add(record["id"])
+    return completed
+
+def write_checkpoint(checkpoint_file, record):
+    checkpoint_file.write(json.dumps(record) + "\n")
+    checkpoint_file.flush()
+    os.fsync(checkpoint_file.fileno())
+
+def worker_profile(worker_id):
+    """Per-worker profile, seeded from the logged-in profile on first use"""
+
+    profile = WORKER_PROFILES_DIR / f"worker-{worker_id}"
+    if not profile.exists() and LOGGED_IN_PROFILE.exists():
+        shutil.copytree(
+            LOGGED_IN_PROFILE,
+            profile,
+            ignore=shutil.ignore_patterns("Singleton*", "*.lock", "Crashpad")
+        )
+    profile.mkdir(parents=True, exist_ok=True)
+    return str(profile)
+
+def job_task(job, uploaded=None):
+    instrumental = 'Make sure "Instrumental" is checked/enabled' if job["instrumental"] \
+        else 'Make sure "Instrumental" is NOT enabled (vocals allowed)'
+
+    if uploaded:
+        source = f"""
+        1. Go to {uploaded['url']}
+        2. Open the clip's options menu and choose "Extend"
+        """
+    else:
+        source = f"""
+        1. Go to suno.com/create (I should already be logged in)
+        2. Click "Upload" and upload the file {job.get('upload_path', job['audio'])}
+        """
+
+    return f"""
+        Extend a guitar recording in Suno:
+        {source}
+        3. {instrumental}
+        4. In the song description/prompt field, enter: "Extend this guitar recording: {job['prompt']}"
+        5. Look for and click the generate/create button
+        6. Confirm that generation has started
+        """
+
+@traced("batch_job")
+async def run_job(job, browser_session, upload_index):
+    """Run one job; returns the id of the clip it produced"""
+
+    content_hash, uploaded = upload_index.lookup(job["audio"])
+    watcher = None if uploaded else await UploadWatcher(browser_session).start()
+
+    agent = Agent(
+        task=task_prompt("batch_job", job_task(job, uploaded)),
+        llm=get_llm(temperature=0.2),
+        browser_session=browser_session,
+        available_file_paths=[str(Path(job.get("upload_path", job["audio"])).resolve())],
+        **budget_agent_kwargs()
+    )
+    try:
+        result = await run_traced(agent, max_steps=25)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
+    if not result.is_done() or result.is_successful() is False:
+        raise RuntimeError(result.final_result() or "agent did not finish the job")
+
+    # Index the uploaded clip, not the generated one the run ends on
+    if watcher is not None and watcher.clip_id:
+        upload_index.record(content_hash, watcher.clip_id, job["audio"])
+    return clip_id_from_history(result)
+
+async def batch_worker(worker_id, queue, checkpoint_file, upload_index, stats, headless):
+    profile_dir = worker_profile(worker_id)
+    browser_session, cold_start = await open_suno_session(profile_dir, headless=headless)
+    print(f"🧵 Worker {worker_id} ready in {cold_start:.1f}s")
+
+    try:
+        first_job = True
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
+            started = time.perf_counter()
+            record = {"id": job["id"], "worker": worker_id}
+            try:
+                # Every job after the first starts from a clean create page
+                if not first_job:
+                    page = await browser_session.get_current_page()
+                    await page.goto("https://suno.com/create")
+                first_job = False
+                record["clip_id"] = await run_job(job, browser_session, upload_index)
+                record["status"] = "done"
+                stats["done"] += 1
+                print(f"✅ [{worker_id}] {job['id']}: {job['prompt']}")
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = f"{type(e).__name__}: {e}"
+                stats["failed"] += 1
+                print(f"❌ [{worker_id}] {job['id']}: {record['error']}")
+            record["seconds"] = round(time.perf_counter() - started, 1)
+            write_checkpoint(checkpoint_file, record)
+    finally:
+        await close_suno_session(browser_session)
+
+async def run_batch(jobs_path, workers=2, headless=False, preprocess=True):
+    """Run every job in jobs_path across `workers` browsers, resuming from the checkpoint
+
+    With preprocess, every pending job's audio is trimmed and normalized
+    across a process pool first, and the smaller file is what gets uploaded.
+    """
+
+    jobs = load_jobs(jobs_path)
+    completed = load_completed(jobs_path)
+    pending = [job for job in jobs if job["id"] not in completed]
+    print(f"📋 {len(jobs)} job(s), {len(jobs) - len(pending)} already done, {len(pending)} to run")
+    if not pending:
+        return {"done": 0, "failed": 0, "jobs_per_hour": 0.0}
+
+    if preprocess:
+        print("🎚️ Preprocessing audio before upload...")
+        prepared = await asyncio.to_thread(preprocess_batch, sorted({job["audio"] for job in pending}))
+        for job in pending:
+            if job["audio"] in prepared:
+                job["upload_path"] = prepared[job["audio"]]["output"]
+
+    queue = asyncio.Queue()
+    for job in pending:
+        queue.put_nowait(job)
+
+    stats = {"done": 0, "failed": 0}
+    upload_index = UploadIndex()
+    started = time.perf_counter()
+
+    with open(checkpoint_path(jobs_path), "a") as checkpoint_file:
+        # A worker that fails (e.g. its browser won't launch) leaves its jobs to the others,
+        # and the checkpoint file stays open until every worker has returned
+        results = await asyncio.gather(*[
+            batch_worker(worker_id, queue, checkpoint_file, upload_index, stats, headless)
+            for worker_id in range(min(workers, len(pending)))
+        ], return_exceptions=True)
+
+    for worker_id, result in enumerate(results):
+        if isinstance(result, Exception):
+            print(f"❌ Worker {worker_id} stopped: {type(result).__name__}: {result}")
+    if not queue.empty():
+        print(f"⚠️ {queue.qsize()} job(s) left unrun, run the batch again to resume them")
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 1)
+    stats["jobs_per_hour"] = round(stats["done"] / elapsed * 3600, 1) if elapsed else 0.0
+    print(f"\n🏁 {stats['done']} done, {stats['failed']} failed in {stats['seconds']}s "
+          f"({stats['jobs_per_hour']} jobs/hour)")
+    print_llm_stats()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL queue of Suno extension jobs")
+    parser.add_argument("jobs", help='JSONL file of {"audio": ..., "prompt": ..., "instrumental": true} jobs')
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--no-preprocess", action="store_true", help="upload the audio files as they are")
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Please set OPENAI_API_KEY in your .env file")
+        return
+
+    asyncio.run(run_batch(args.jobs, workers=args.workers, headless=args.headless, preprocess=not args.no_preprocess))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# clip_scoring.py
+import argparse
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+from audio_prep import decode_audio
+
+ANALYSIS_RATE = 22050
+ANALYSIS_SECONDS = 30
+OPENING_SECONDS = 10
+FRAME_SIZE = 2048
+HOP_SIZE = 512
+MIN_BPM, MAX_BPM = 60, 200
+
+# Log-Gaussian tempo prior: lags are weighted around this tempo, with this spread in octaves,
+# so a beat's multiples (half time and slower) don't outscore the beat itself
+PRIOR_BPM = 120
+PRIOR_OCTAVES = 1.0
+
+# Loudness that sounds finished without being crushed, as overall RMS in dBFS
+TARGET_RMS_DB = -16.0
+
+WEIGHTS = {"tempo": 0.3, "key": 0.3, "opening": 0.25, "loudness": 0.15}
+
+PITCH_CLASSES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+# Krumhansl-Kessler key profiles
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+def load_batch(paths, rate=ANALYSIS_RATE, seconds=ANALYSIS_SECONDS):
+    """Decode paths to one zero-padded (clips, samples) mono matrix plus each clip's length"""
+
+    def load(path):
+        samples, _ = decode_audio(path, sample_rate=rate)
+        return samples.mean(axis=1)[:int(rate * seconds)]
+
+    with ThreadPoolExecutor() as pool:
+        clips = list(pool.map(load, paths))
+
+    lengths = np.array([len(clip) for clip in clips])
+    batch = np.zeros((len(clips), max(lengths.max(), FRAME_SIZE)), dtype=np.float32)
+    for i, clip in enumerate(clips):
+        batch[i, :len(clip)] = clip
+    return batch, lengths
+
+def _chroma_matrix(rate=ANALYSIS_RATE):
+    """(bins, 12) map from FFT bins between A1 and ~B6 to pitch classes"""
+
+    freqs = np.fft.rfftfreq(FRAME_SIZE, 1 / rate)
+    matrix = np.zeros((len(freqs), 12), dtype=np.float32)
+    valid = (freqs >= 55) & (freqs <= 2000)
+    pitch_class = (np.round(12 * np.log2(freqs[valid] / 440) + 69) % 12).astype(int)
+    matrix[np.flatnonzero(valid), pitch_class] = 1.0
+    return matrix
+
+def analyze(batch, lengths, rate=ANALYSIS_RATE):
+    """Features for every clip in the batch at once
+
+    Returns rms_db, bpm, mean chroma, per-frame chroma and a frame mask,
+    each with the clips along the first axis.
+    """
+
+    frames = np.lib.stride_tricks.sliding_window_view(batch, FRAME_SIZE, axis=1)[:, ::HOP_SIZE]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME_SIZE).astype(np.float32), axis=2))
+
+    frame_starts = np.arange(frames.shape[1]) * HOP_SIZE
+    mask = frame_starts[None, :] + FRAME_SIZE <= np.maximum(lengths, FRAME_SIZE)[:, None]
+
+    # Loudness over each clip's real samples only
+    sample_mask = np.arange(batch.shape[1])[None, :] < lengths[:, None]
+    rms = np.sqrt((batch ** 2 * sample_mask).sum(axis=1) / np.maximum(lengths, 1))
+    rms_db = 20 * np.log10(np.maximum(rms, 1e-10))
+
+    # Chroma per frame, normalized, then averaged over valid frames
+    chroma = (spectrum ** 2) @ _chroma_matrix(rate)
+    chroma /= np.maximum(chroma.sum(axis=2, keepdims=True), 1e-10)
+    mean_chroma = (chroma * mask[:, :, None]).sum(axis=1) / np.maximum(mask.sum(axis=1), 1)[:, None]
+
+    # Tempo from the autocorrelation of spectral flux
+    flux = np.maximum(np.diff(np.log1p(spectrum), axis=1), 0).sum(axis=2) * mask[:, 1:]
+    flux -= flux.mean(axis=1, keepdims=True)
+    n = flux.shape[1]
+    power = np.abs(np.fft.rfft(flux, 2 * n, axis=1)) ** 2
+    lags = np.arange(n)
+    # Unbiased: each lag averages over the frames it overlaps, not the whole clip
+    autocorrelation = np.fft.irfft(power, axis=1)[:, :n] / np.maximum(n - lags, 1)
+    frame_rate = rate / HOP_SIZE
+    in_range = (lags >= frame_rate * 60 / MAX_BPM) & (lags <= frame_rate * 60 / MIN_BPM)
+    if in_range.any():
+        lag_bpm = 60 * frame_rate / np.maximum(lags, 1)
+        prior = np.exp(-0.5 * (np.log2(lag_bpm / PRIOR_BPM) / PRIOR_OCTAVES) ** 2)
+        weighted = np.where(in_range[None, :], autocorrelation * prior, -np.inf)
+        best_lag = weighted.argmax(axis=1)
+        # Parabolic interpolation between neighbouring lags, a beat rarely lands on a whole frame
+        rows = np.arange(len(batch))
+        below = autocorrelation[rows, np.maximum(best_lag - 1, 0)]
+        peak = autocorrelation[rows, best_lag]
+        above = autocorrelation[rows, np.minimum(best_lag + 1, n - 1)]
+        curvature = below - 2 * peak + above
+        offset = np.where(curvature < 0, 0.5 * (below - above) / np.where(curvature < 0, curvature, -1), 0)
+        bpm = 60 * frame_rate / np.maximum(best_lag + np.clip(offset, -0.5, 0.5), 1)
+    else:
+        bpm = np.full(len(batch), np.nan)
+
+    return {"rms_db": rms_db, "bpm": bpm, "mean_chroma": mean_chroma, "chroma": chroma, "mask": mask}
+
+def _zscore(x):
+    return (x - x.mean(axis=-1, keepdims=True)) / np.maximum(x.std(axis=-1, keepdims=True), 1e-10)
+
+def estimate_keys(mean_chroma):
+    """Most likely key name per clip, by correlation with rotated major/minor profiles"""
+
+    profiles = np.array(
+        [np.roll(MAJOR_PROFILE, shift) for shift in range(12)] + [np.roll(MINOR_PROFILE, shift) for shift in range(12)]
+    )
+    best = (_zscore(mean_chroma) @ _zscore(profiles).T).argmax(axis=1)
+    return [f"{PITCH_CLASSES[index % 12]} {'major' if index < 12 else 'minor'}" for index in best]
+
+def _cosine(a, b):
+    return (a * b).sum(axis=-1) / np.maximum(np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1), 1e-10)
+
+def score_candidates(features, reference, opening_frames):
+    """Score every candidate against the reference features; returns per-criterion and total scores"""
+
+    # Tempo agreement, forgiving half/double-time readings
+    octaves = np.abs(np.log2(features["bpm"] / reference["bpm"]))
+    tempo = np.exp(-np.minimum(octaves, np.abs(octaves - 1)) / 0.05)
+
+    key = _cosine(features["mean_chroma"], reference["mean_chroma"][None, :])
+    loudness = np.exp(-np.abs(features["rms_db"] - TARGET_RMS_DB) / 6)
+
+    scores = {"tempo": np.nan_to_num(tempo), "key": key, "loudness": loudness}
+    weights = dict(WEIGHTS)
+    if reference.get("chroma") is not None:
+        frames = min(opening_frames, features["chroma"].shape[1], reference["chroma"].shape[0])
+        similarity = _cosine(features["chroma"][:, :frames], reference["chroma"][None, :frames])
+        mask = features["mask"][:, :frames] & reference["mask"][None, :frames]
+        scores["opening"] = (similarity * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1)
+    else:
+        del weights["opening"]
+
+    total = sum(weights[name] * scores[name] for name in weights) / sum(weights.values())
+    return scores, total
+
+def rank_candidates(candidate_paths, input_path=None, top_k=None):
+    """Rank generated clips by agreement with the input recording, best first
+
+    Everything is decoded into one matrix and analyzed in a single batch.
+    Without an input clip the candidates' consensus (median tempo, mean
+    chroma) is the reference and the opening comparison is skipped.
+    """
+
+    paths = ([input_path] if input_path else []) + list(candidate_paths)
+    batch, lengths = load_batch(paths)
+    features = analyze(batch, lengths)
+    keys = estimate_keys(features["mean_chroma"])
+
+    if input_path:
+        reference = {name: value[0] for name, value in features.items()}
+        features = {name: value[1:] for name, value in features.items()}
+        keys = keys[1:]
+    else:
+        reference = {
+            "bpm": np.nanmedian(features["bpm"]),
+            "mean_chroma": features["mean_chroma"].mean(axis=0),
+            "chroma": None
+        }
+
+    opening_frames = int(OPENING_SECONDS * ANALYSIS_RATE / HOP_SIZE)
+    scores, total = score_candidates(features, reference, opening_frames)
+
+    ranking = []
+    for i, path in enumerate(candidate_paths):
+        ranking.append({
+            "file": str(path),
+            "score": round(float(total[i]), 4),
+            "bpm": round(float(features["bpm"][i]), 1),
+            "key": keys[i],
+            "rms_db": round(float(features["rms_db"][i]), 1),
+            **{f"{name}_score": round(float(value[i]), 4) for name, value in scores.items()}
+        })
+    ranking.sort(key=lambda entry: entry["score"], reverse=True)
+    for position, entry in enumerate(ranking):
+        entry["kept"] = top_k is None or position < top_k
+    return ranking
+
+def keep_top_k(ranking, rejected_dir):
+    """Move files not kept by rank_candidates() into rejected_dir"""
+
+    rejected_dir = Path(rejected_dir)
+    for entry in ranking:
+        if not entry["kept"] and Path(entry["file"]).exists():
+            rejected_dir.mkdir(parents=True, exist_ok=True)
+            entry["file"] = str(shutil.move(entry["file"], rejected_dir / Path(entry["file"]).name))
+    return [entry for entry in ranking if entry["kept"]]
+
+def print_ranking(ranking):
+    print(f"\n🏆 {'score':>6} {'tempo':>6} {'key':>6} {'open':>6} {'loud':>6} {'bpm':>6}  {'key':<9} file")
+    for entry in ranking:
+        marker = "✅" if entry["kept"] else "  "
+        opening = entry.get("opening_score")
+        print(
+            f"{marker} {entry['score']:>6.3f} {entry['tempo_score']:>6.2f} {entry['key_score']:>6.2f} "
+            f"{opening if opening is not None else float('nan'):>6.2f} {entry['loudness_score']:>6.2f} "
+            f"{entry['bpm']:>6.1f}  {entry['key']:<9} {Path(entry['file']).name}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank generated clips against the input recording")
+    parser.add_argument("candidates", nargs="+")
+    parser.add_argument("--input", help="the original guitar recording")
+    parser.add_argument("--keep", type=int, default=None, help="keep only the top K")
+    parser.add_argument("--rejected-dir", help="move the rest here")
+    parser.add_argument("--json", help="write the ranking to this file")
+    args = parser.parse_args()
+
+    ranking = rank_candidates(args.candidates, args.input, args.keep)
+    if args.keep is not None and args.rejected_dir:
+        keep_top_k(ranking, args.rejected_dir)
+    print_ranking(ranking)
+    if args.json:
+        Path(args.json).write_text(json.dumps(ranking, indent=2))
+
+if __name__ == "__main__":
+    main()
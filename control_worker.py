@@ -0,0 +1,114 @@
+# control_worker.py
+import asyncio
+import time
+from pathlib import Path
+from browser_use import Agent
+from llm_client import get_llm
+from suno_session import open_suno_session, close_suno_session
+from tracing import traced, run_traced
+from prompt_budget import task_prompt, budget_agent_kwargs
+
+class WarmControlWorker:
+    """Long-lived worker that runs commands against one warm Suno browser
+
+    Commands are queued and executed one at a time on the same browser
+    session, so each action costs agent steps only, never a browser launch.
+    """
+
+    def __init__(self, profile_dir=None, headless=False, browser_args=None):
+        self.profile_dir = profile_dir or str(Path.home() / ".suno_browser_profile")
+        self.headless = headless
+        self.browser_args = browser_args
+        self.browser_session = None
+        self.commands = asyncio.Queue()
+        self.latencies = {}
+        self._worker_task = None
+
+    async def start(self):
+        """Launch the browser and start consuming commands"""
+
+        self.browser_session, cold_start = await open_suno_session(
+            self.profile_dir, headless=self.headless, browser_args=self.browser_args
+        )
+        self._worker_task = asyncio.create_task(self._run())
+        print(f"🔥 Browser warmed up in {cold_start:.1f}s")
+        return cold_start
+
+    async def stop(self):
+        """Drain the queue, stop the worker and close the browser"""
+
+        if self._worker_task is not None:
+            await self.commands.put(None)
+            await self._worker_task
+            self._worker_task = None
+        await close_suno_session(self.browser_session)
+        self.browser_session = None
+
+    async def submit(self, name, step):
+        """Queue step(browser_session) and wait for its result"""
+
+        future = asyncio.get_running_loop().create_future()
+        await self.commands.put((name, step, future, time.perf_counter()))
+        return await future
+
+    async def run_task(self, name, task, temperature=None):
+        """Queue a plain agent task on the warm browser"""
+
+        async def step(browser_session):
+            agent = Agent(
+                task=task_prompt(name, task),
+                llm=get_llm(temperature=temperature),
+                browser_session=browser_session,
+                **budget_agent_kwargs()
+            )
+            return await run_traced(agent)
+
+        return await self.submit(name, traced(f"control_{name}")(step))
+
+    async def _run(self):
+        while True:
+            item = await self.commands.get()
+            if item is None:
+                self.commands.task_done()
+                break
+
+            name, step, future, queued_at = item
+            started = time.perf_counter()
+            try:
+                result = await step(self.browser_session)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                finished = time.perf_counter()
+                self.latencies.setdefault(name, []).append({
+                    "queued": started - queued_at,
+                    "total": finished - queued_at
+                })
+                self.commands.task_done()
+
+    def last_latency(self, name):
+        """Total latency of the most recent run of a command, in seconds"""
+
+        runs = self.latencies.get(name)
+        return runs[-1]["total"] if runs else None
+
+    def print_latencies(self):
+        """Print per-command latency stats"""
+
+        if not self.latencies:
+            return
+
+        print("\n⏱️  Command latency:")
+        for name, runs in self.latencies.items():
+            totals = [run["total"] for run in runs]
+            queued = [run["queued"] for run in runs]
+            print(
+                f"   {name}: {len(runs)} run(s), "
+                f"avg {sum(totals) / len(totals):.1f}s, "
+                f"max {max(totals):.1f}s, "
+                f"avg queue wait {sum(queued) / len(queued):.2f}s"
+            )
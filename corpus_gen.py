@@ -0,0 +1,167 @@
+# corpus_gen.py
+import argparse
+import hashlib
+import json
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from fake_audio import file_sha256
+
+DEFAULT_CORPUS_DIR = Path.home() / "suno_test_corpus"
+
+KEYS = {
+    "C": 130.81, "C#": 138.59, "D": 146.83, "D#": 155.56, "E": 164.81, "F": 174.61,
+    "F#": 185.00, "G": 196.00, "G#": 207.65, "A": 220.00, "A#": 233.08, "B": 246.94
+}
+
+# Chords as semitone offsets from the key root
+PROGRESSIONS = {
+    "I-V-vi-IV": [(0, 4, 7), (7, 11, 14), (9, 12, 16), (5, 9, 12)],
+    "I-IV-V": [(0, 4, 7), (5, 9, 12), (7, 11, 14)],
+    "ii-V-I": [(2, 5, 9), (7, 11, 14), (0, 4, 7)],
+    "i-VI-III-VII": [(0, 3, 7), (8, 12, 15), (3, 7, 10), (10, 14, 17)],
+    "power-chords": [(0, 7, 12), (5, 12, 17), (7, 14, 19)],
+    "open-drone": [(0, 7), (0, 5), (0, 7, 12)]
+}
+
+def build_specs(count, seed=0, duration=8):
+    """Deterministically build `count` distinct clip specs"""
+
+    rng = random.Random(seed)
+    specs = []
+    for i in range(count):
+        key = rng.choice(list(KEYS))
+        progression = rng.choice(list(PROGRESSIONS))
+        tempo = rng.randrange(70, 161, 5)
+        noise = rng.choice([0.0, 0.005, 0.02, 0.05])
+        specs.append({
+            "name": f"clip-{i:04d}-{key.replace('#', 's')}-{progression}-{tempo}bpm",
+            "key": key,
+            "progression": progression,
+            "tempo": tempo,
+            "noise": noise,
+            "decay": round(rng.uniform(1.5, 4.0), 2),
+            "duration": duration,
+            "seed": i
+        })
+    return specs
+
+def params_hash(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def render_clip(spec, out_dir):
+    """Render one spec to WAV (runs in a worker process)"""
+
+    from wav_synth import synthesize_progression_wav
+
+    started = time.perf_counter()
+    path = synthesize_progression_wav(
+        Path(out_dir) / f"{spec['name']}.wav",
+        root=KEYS[spec["key"]],
+        progression=PROGRESSIONS[spec["progression"]],
+        tempo=spec["tempo"],
+        noise=spec["noise"],
+        decay=spec["decay"],
+        duration=spec["duration"],
+        seed=spec["seed"]
+    )
+
+    return {
+        "name": spec["name"],
+        "path": path,
+        "sha256": file_sha256(path),
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - started, 3),
+        "worker_peak_rss_mb": round(_peak_rss_mb(), 1)
+    }
+
+def load_manifest(out_dir):
+    manifest_path = Path(out_dir) / "manifest.json"
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())
+    return {}
+
+def save_manifest(out_dir, manifest):
+    manifest_path = Path(out_dir) / "manifest.json"
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp_path, manifest_path)
+
+def generate_corpus(specs, out_dir=DEFAULT_CORPUS_DIR, workers=None):
+    """Render specs across a process pool, skipping clips whose parameters are unchanged"""
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+
+    pending = []
+    for spec in specs:
+        entry = manifest.get(spec["name"])
+        if entry and entry["params_hash"] == params_hash(spec) and (out_dir / f"{spec['name']}.wav").exists():
+            continue
+        pending.append(spec)
+
+    skipped = len(specs) - len(pending)
+    print(f"🎼 {len(pending)} clip(s) to render, {skipped} unchanged")
+
+    started = time.perf_counter()
+    worker_peak = 0.0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render_clip, spec, str(out_dir)): spec for spec in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            spec = futures[future]
+            clip = future.result()
+            worker_peak = max(worker_peak, clip.pop("worker_peak_rss_mb"))
+            manifest[spec["name"]] = {
+                "params": spec,
+                "params_hash": params_hash(spec),
+                "sha256": clip["sha256"],
+                "bytes": clip["bytes"],
+                "seconds": clip["seconds"]
+            }
+            if done % 50 == 0:
+                save_manifest(out_dir, manifest)
+
+    save_manifest(out_dir, manifest)
+    elapsed = time.perf_counter() - started
+
+    stats = {
+        "rendered": len(pending),
+        "skipped": skipped,
+        "seconds": round(elapsed, 2),
+        "clips_per_second": round(len(pending) / elapsed, 2) if pending and elapsed else 0.0,
+        "peak_rss_mb": {
+            "parent": round(_peak_rss_mb(), 1),
+            "worker": worker_peak
+        }
+    }
+    print(
+        f"✅ Rendered {stats['rendered']} clip(s) in {stats['seconds']}s "
+        f"({stats['clips_per_second']} clips/s), peak RSS parent {stats['peak_rss_mb']['parent']}MB, "
+        f"worker {stats['peak_rss_mb']['worker']}MB"
+    )
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a corpus of synthetic guitar clips")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=str(DEFAULT_CORPUS_DIR))
+    args = parser.parse_args()
+
+    specs = build_specs(args.count, seed=args.seed, duration=args.duration)
+    generate_corpus(specs, args.out, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
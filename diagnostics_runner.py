@@ -0,0 +1,75 @@
+# diagnostics_runner.py
+import asyncio
+import json
+import time
+
+async def _run_diagnostic(name, diagnostic, semaphore):
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            result = await diagnostic()
+            status, error = "passed", None
+        except Exception as e:
+            result, status, error = None, "failed", f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+
+    return {
+        "name": name,
+        "status": status,
+        "started": started,
+        "seconds": round(finished - started, 2),
+        "result": None if result is None else str(result),
+        "error": error
+    }
+
+async def run_diagnostics(diagnostics, concurrency=3):
+    """Run named async diagnostics concurrently and merge them into one report
+
+    diagnostics is a list of (name, coroutine_function) pairs. Each
+    diagnostic is expected to use its own browser profile.
+    """
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.perf_counter()
+
+    tests = await asyncio.gather(*[
+        _run_diagnostic(name, diagnostic, semaphore) for name, diagnostic in diagnostics
+    ])
+    wall_seconds = time.perf_counter() - started
+
+    for test in tests:
+        test["started"] = round(test["started"] - started, 2)
+
+    return {
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 2),
+        "sequential_seconds": round(sum(test["seconds"] for test in tests), 2),
+        "passed": sum(test["status"] == "passed" for test in tests),
+        "failed": sum(test["status"] == "failed" for test in tests),
+        "tests": tests
+    }
+
+def print_diagnostics_report(report):
+    """Print a diagnostics report produced by run_diagnostics()"""
+
+    print("\n📋 Diagnostics report")
+    print("=" * 50)
+    for test in report["tests"]:
+        icon = "✅" if test["status"] == "passed" else "❌"
+        print(f"{icon} {test['name']}: {test['seconds']:.1f}s (started +{test['started']:.1f}s)")
+        if test["error"]:
+            print(f"   Error: {test['error']}")
+        elif test["result"]:
+            print(f"   Result: {test['result'][:300]}")
+
+    print(
+        f"\n⏱️  Wall clock {report['wall_seconds']:.1f}s vs {report['sequential_seconds']:.1f}s sequential "
+        f"(concurrency {report['concurrency']}, {report['passed']} passed, {report['failed']} failed)"
+    )
+
+def save_diagnostics_report(report, path):
+    """Write a diagnostics report as JSON"""
+
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Saved diagnostics report: {path}")
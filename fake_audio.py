@@ -0,0 +1,68 @@
+# fake_audio.py
+import hashlib
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+DEFAULT_CLIP = Path(__file__).resolve().parent / "guitar-test.m4a"
+FAKE_AUDIO_CACHE = Path.home() / ".suno_fake_audio"
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash a file in chunks without loading it into memory"""
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fake_audio_clip_from_env():
+    """Clip to feed as the microphone, from SUNO_FAKE_AUDIO ("1" means the bundled clip)"""
+
+    value = os.getenv("SUNO_FAKE_AUDIO", "").strip()
+    if not value or value.lower() in ("0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return str(DEFAULT_CLIP)
+    return value
+
+def prepare_fake_audio(clip=DEFAULT_CLIP, cache_dir=FAKE_AUDIO_CACHE):
+    """Transcode a clip to the 16-bit PCM WAV Chromium's fake capture expects
+
+    Results are cached by the clip's content hash, so repeated runs reuse
+    the converted file.
+    """
+
+    clip = Path(clip)
+    if not clip.exists():
+        raise FileNotFoundError(f"Fake audio clip not found: {clip}")
+
+    cache_dir = Path(cache_dir)
+    wav_path = cache_dir / f"{file_sha256(clip)[:16]}.wav"
+    if wav_path.exists():
+        return str(wav_path)
+
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError("ffmpeg is required to convert fake audio clips to WAV")
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = wav_path.with_suffix(".tmp.wav")
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", str(clip),
+         "-acodec", "pcm_s16le", "-ar", "48000", "-ac", "2", str(tmp_path)],
+        check=True
+    )
+    os.replace(tmp_path, wav_path)
+
+    print(f"🎧 Prepared fake microphone audio: {wav_path}")
+    return str(wav_path)
+
+def fake_audio_browser_args(clip=DEFAULT_CLIP):
+    """Chromium flags that replace the microphone with a looping audio file"""
+
+    return [
+        "--use-fake-ui-for-media-stream",
+        "--use-fake-device-for-media-stream",
+        f"--use-file-for-fake-audio-capture={prepare_fake_audio(clip)}"
+    ]
@@ -3,18 +3,24 @@ import asyncio
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from browser_use import Agent
-from browser_use.llm import ChatOpenAI
+from upload_cache import UploadIndex, UploadWatcher
+from tracing import traced, run_traced
 
 load_dotenv()
 
+@traced("try_drag_drop_upload")
 async def try_drag_drop_upload():
     """Try drag and drop instead of file picker"""
     
+    from browser_use import Agent
+    from llm_client import get_llm
+    from prompt_budget import task_prompt, budget_agent_kwargs
+    from suno_session import agent_browser_kwargs
+    
     profile_dir = str(Path.home() / ".suno_browser_profile")
     
     agent = Agent(
-        task="""
+        task=task_prompt("drag_drop", """
         Look for drag and drop upload on Suno:
         
         1. Go to suno.com/create
@@ -24,31 +30,49 @@ async def try_drag_drop_upload():
         5. Report what upload options you can see (Upload button, drag zones, etc.)
         
         Focus on finding drag & drop upload areas.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ),
-        browser_session_config={
-            "user_data_dir": profile_dir,
-            "headless": False
-        }
+        """),
+        llm=get_llm(temperature=0.1),
+        **agent_browser_kwargs(profile_dir),
+        **budget_agent_kwargs()
     )
     
     print("🎯 Looking for drag & drop upload areas...")
-    result = await agent.run()
+    result = await run_traced(agent)
     print("✅ Drag & drop result:", result)
     
     return result
 
-async def manual_upload_continuation():
-    """Continue after user manually selects file"""
+@traced("manual_upload_continuation")
+async def manual_upload_continuation(browser_session=None, selector_cache=None, replay=True):
+    """Continue after user manually selects file
+
+    Given a live browser_session and a SelectorCache, the instrumental,
+    prompt and generate steps use cached selectors with agent fallback.
+    Otherwise a recorded trajectory is replayed first when replay is set.
+    """
+    
+    from browser_use import Agent
+    from llm_client import get_llm
+    from prompt_budget import task_prompt, budget_agent_kwargs
+    from suno_session import agent_browser_kwargs
+    from selector_cache import run_cached_steps
+    from trajectory_replay import run_with_replay
     
     profile_dir = str(Path.home() / ".suno_browser_profile")
     
+    if browser_session is not None and selector_cache is not None:
+        print("🎵 Continuing after manual file selection (cached selectors)...")
+        result = await run_cached_steps(browser_session, selector_cache, [
+            ("instrumental_toggle", "check", None),
+            ("prompt_field", "fill", "Extend this guitar recording: add drums and bass"),
+            ("generate_button", "click", None)
+        ])
+        print("✅ Continuation result:", result)
+        selector_cache.print_stats()
+        return result
+    
     agent = Agent(
-        task="""
+        task=task_prompt("upload_continuation", """
         Continue after file upload:
         
         1. I should see that a file has been uploaded to Suno
@@ -59,24 +83,127 @@ async def manual_upload_continuation():
         6. Tell me when AI generation has started
         
         Continue the workflow after file upload is complete.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ),
-        browser_session_config={
-            "user_data_dir": profile_dir,
-            "headless": False
-        }
+        """),
+        llm=get_llm(temperature=0.1),
+        **agent_browser_kwargs(profile_dir, browser_session),
+        **budget_agent_kwargs()
     )
     
     print("🎵 Continuing after manual file selection...")
-    result = await agent.run()
+    result = await run_with_replay(agent, replay=replay)
     print("✅ Continuation result:", result)
     
     return result
 
+@traced("extend_existing_clip")
+async def extend_existing_clip(entry, extension_prompt="add drums and bass", browser_session=None):
+    """Go straight to the extension prompt for a clip that is already uploaded
+
+    Runs in browser_session when given (e.g. a tab from multi_tab), else in
+    a new browser on the Suno profile.
+    """
+    
+    from browser_use import Agent
+    from llm_client import get_llm
+    from prompt_budget import task_prompt, budget_agent_kwargs
+    from suno_session import agent_browser_kwargs
+    
+    profile_dir = str(Path.home() / ".suno_browser_profile")
+    
+    agent = Agent(
+        task=task_prompt("extend_clip", f"""
+        Extend a guitar recording that is already uploaded to Suno:
+        
+        1. Go to {entry['url']}
+        2. Open the clip's options menu and choose "Extend"
+        3. Make sure "Instrumental" is selected (no vocals)
+        4. In any prompt field, enter: "Extend this guitar recording: {extension_prompt}"
+        5. Look for and click the generate/create button
+        6. Tell me when AI generation has started
+        """, url=entry["url"], extension_prompt=extension_prompt),
+        llm=get_llm(temperature=0.1),
+        **agent_browser_kwargs(profile_dir, browser_session),
+        **budget_agent_kwargs()
+    )
+    
+    print(f"♻️ Reusing uploaded clip {entry['clip_id']}...")
+    result = await run_traced(agent)
+    print("✅ Extension result:", result)
+    
+    return result
+
+@traced("extend_clip_in_tabs")
+async def extend_clip_in_tabs(entry, prompts, concurrency=None, wait=True):
+    """Extend one uploaded clip once per prompt, each from its own tab of one browser
+
+    Every tab opens the clip's song page, so the recording never has to be
+    carried between tabs. Finished clips are downloaded into the archive
+    when wait is set. Returns the finished clips.
+    """
+    
+    from generation_waiter import print_finished_clips
+    from multi_tab import TAB_CONCURRENCY, generate_in_tabs
+    from suno_session import close_suno_session, open_suno_session
+    from track_downloader import download_tracks
+    
+    async def submit(prompt, tab_session):
+        result = await extend_existing_clip(entry, prompt, browser_session=tab_session)
+        if not result.is_done() or result.is_successful() is False:
+            raise RuntimeError(result.final_result() or "agent did not start the extension")
+    
+    print(f"🗂️  Extending clip {entry['clip_id']} {len(prompts)} ways from tabs...")
+    browser_session, _ = await open_suno_session(str(Path.home() / ".suno_browser_profile"), url=entry["url"])
+    try:
+        _, clips = await generate_in_tabs(
+            prompts, browser_session, submit, entry["url"], concurrency=concurrency or TAB_CONCURRENCY, wait=wait
+        )
+        if clips:
+            print_finished_clips(clips)
+            input_clip = entry.get("file") if entry.get("file") and Path(entry["file"]).exists() else None
+            await download_tracks(browser_session, clips, prompt=prompts, input_clip=input_clip)
+    finally:
+        await close_suno_session(browser_session)
+    return clips
+
+async def upload_or_reuse(audio_path, select_prompt, preprocess=True, browser_session=None, selector_cache=None):
+    """Skip the upload when this audio was uploaded before, else continue after a manual upload
+
+    With preprocess, a trimmed and normalized copy is prepared for the user
+    to select instead of the raw recording. browser_session is used by
+    whichever path runs (a second browser can't open the same profile), and
+    selector_cache is passed on to manual_upload_continuation().
+    """
+    
+    upload_index = UploadIndex()
+    content_hash, entry = upload_index.lookup(audio_path)
+    
+    if entry:
+        print(f"♻️ {Path(audio_path).name} is already on Suno as {entry['clip_id']}, skipping the upload")
+        await asyncio.to_thread(input, "Close the file dialog, then press Enter...")
+        result = await extend_existing_clip(entry, browser_session=browser_session)
+    else:
+        if preprocess:
+            from audio_prep import preprocess_audio
+            upload_path = preprocess_audio(audio_path)
+            print(f"📁 Select the preprocessed file instead of the original: {upload_path}")
+        # The upload happens while the user selects the file, so listen before prompting
+        watcher = await UploadWatcher(browser_session).start() if browser_session is not None else None
+        try:
+            # Read off the event loop so the watcher sees the upload response meanwhile
+            await asyncio.to_thread(input, select_prompt)
+            result = await manual_upload_continuation(browser_session=browser_session, selector_cache=selector_cache)
+        finally:
+            if watcher is not None:
+                watcher.stop()
+        if watcher is not None and watcher.clip_id:
+            upload_index.record(content_hash, watcher.clip_id, audio_path)
+            print(f"📇 Indexed upload as clip {watcher.clip_id}")
+        else:
+            print("⚠️ No upload response seen, this upload was not indexed")
+    
+    upload_index.print_stats()
+    return result
+
 def create_desktop_test_file():
     """Create a test audio file on Desktop for easy access"""
     
@@ -87,30 +214,19 @@ def create_desktop_test_file():
         return str(desktop_path)
     
     try:
-        import numpy as np
-        import wave
+        from wav_synth import synthesize_wav
         
         print("🎵 Creating test guitar file on Desktop...")
         
-        # Simple guitar-like sound
-        duration = 8  # seconds
-        sample_rate = 44100
-        frequency = 220  # A3
-        
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
-        wave_data = (
-            0.6 * np.sin(2 * np.pi * frequency * t) +
-            0.3 * np.sin(2 * np.pi * frequency * 2 * t) +
-            0.1 * np.sin(2 * np.pi * frequency * 3 * t)
-        ) * np.exp(-0.5 * t)  # Decay envelope
-        
-        wave_data = (wave_data * 32767).astype(np.int16)
-        
-        with wave.open(str(desktop_path), 'w') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(wave_data.tobytes())
+        # Simple guitar-like sound: 8 seconds of A3, synthesized block by block
+        synthesize_wav(
+            desktop_path,
+            frequency=220,
+            harmonics=(0.6, 0.3, 0.1),
+            decay=0.5,
+            duration=8,
+            sample_rate=44100
+        )
         
         print(f"✅ Created test file: {desktop_path}")
         return str(desktop_path)
@@ -119,6 +235,20 @@ def create_desktop_test_file():
         print("❌ Cannot create test file (numpy not available)")
         return None
 
+async def _open_upload_session():
+    """One browser for the upload and the continuation, so cached selectors can be used"""
+    
+    from selector_cache import SelectorCache
+    from suno_session import open_suno_session
+    
+    print("🌐 Opening the Suno browser, do the upload in this window...")
+    browser_session, _ = await open_suno_session(str(Path.home() / ".suno_browser_profile"))
+    return browser_session, SelectorCache()
+
+async def _close_upload_session(browser_session):
+    from suno_session import close_suno_session
+    await close_suno_session(browser_session)
+
 async def main():
     if not os.getenv("OPENAI_API_KEY"):
         print("❌ Please set OPENAI_API_KEY in your .env file")
@@ -138,8 +268,19 @@ async def main():
 Choice (1-4): """)
     
     if choice == "1":
-        input("\n📁 Manually select your audio file in the dialog and click Open, then press Enter here...")
-        await manual_upload_continuation()
+        audio_path = input("\n📁 Path of the audio file you're uploading (Enter to skip dedup): ").strip()
+        select_prompt = "\n📁 Manually select your audio file in the dialog and click Open, then press Enter here..."
+        browser_session, selector_cache = await _open_upload_session()
+        try:
+            if audio_path and Path(audio_path).exists():
+                await upload_or_reuse(
+                    audio_path, select_prompt, browser_session=browser_session, selector_cache=selector_cache
+                )
+            else:
+                input(select_prompt)
+                await manual_upload_continuation(browser_session=browser_session, selector_cache=selector_cache)
+        finally:
+            await _close_upload_session(browser_session)
         
     elif choice == "2":
         # First close the current dialog
@@ -152,8 +293,14 @@ Choice (1-4): """)
         if test_file:
             print(f"\n📁 Test file created: {test_file}")
             print("💡 Now go back to the file dialog and select this file from Desktop")
-            input("Press Enter after selecting the file...")
-            await manual_upload_continuation()
+            browser_session, selector_cache = await _open_upload_session()
+            try:
+                await upload_or_reuse(
+                    test_file, "Press Enter after selecting the file...",
+                    browser_session=browser_session, selector_cache=selector_cache
+                )
+            finally:
+                await _close_upload_session(browser_session)
             
     elif choice == "4":
         print("💡 Try pressing Escape or clicking Cancel to close the dialog")
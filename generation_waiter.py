@@ -0,0 +1,179 @@
+# generation_waiter.py
+import asyncio
+import time
+from datetime import datetime
+from upload_cache import SONG_ID_PATTERN
+
+# Clip statuses reported by Suno's feed/generate API responses
+DONE_STATUSES = {"complete"}
+FAILED_STATUSES = {"error", "failed"}
+
+# Fallback DOM probe: song cards that show a duration have finished rendering
+DOM_PROBE_SCRIPT = """
+() => Array.from(document.querySelectorAll('a[href*="/song/"]')).map(link => {
+    const card = link.closest('[role="row"], li, article, div') || link;
+    return {
+        href: link.href,
+        title: (link.textContent || '').trim(),
+        duration: ((card.textContent || '').match(/\\b\\d{1,2}:\\d{2}\\b/) || [null])[0]
+    };
+})
+"""
+
+def _clip_metadata(clip):
+    return {
+        "id": clip.get("id"),
+        "title": clip.get("title"),
+        "status": clip.get("status"),
+        "audio_url": clip.get("audio_url"),
+        "image_url": clip.get("image_url"),
+        "duration": (clip.get("metadata") or {}).get("duration")
+    }
+
+# Keys only clip objects carry; a bare id and status also matches jobs, users and the like
+CLIP_KEYS = {"audio_url", "created_at"}
+
+def _find_clips(payload):
+    """Clip-shaped dicts (an id, a status and a clip-only key) anywhere in an API response"""
+
+    if isinstance(payload, dict):
+        if "id" in payload and "status" in payload and CLIP_KEYS & payload.keys():
+            return [payload]
+        return [clip for value in payload.values() for clip in _find_clips(value)]
+    if isinstance(payload, list):
+        return [clip for item in payload for clip in _find_clips(item)]
+    return []
+
+class GenerationWaiter:
+    """Resolve a future when a Suno generation finishes, without any LLM calls
+
+    Start it before clicking generate: it watches the page's API responses
+    for the clips being created and their status, and falls back to probing
+    the DOM with exponential backoff when the network stays quiet. With
+    whole_context it watches every tab of the browser context instead, for
+    generations submitted from several tabs at once.
+    """
+
+    def __init__(self, browser_session, expected_clips=2, whole_context=False):
+        self.browser_session = browser_session
+        self.expected_clips = expected_clips
+        self.whole_context = whole_context
+        self.clips = {}
+        self.future = None
+        self.page = None
+        self.source = None
+        self.started = None
+        self._known_song_ids = set()
+
+    async def start(self):
+        self.page = await self.browser_session.get_current_page()
+        self.future = asyncio.get_running_loop().create_future()
+        self.started = time.time()
+
+        # Songs already on the page are not part of this generation
+        for item in await self.page.evaluate(DOM_PROBE_SCRIPT):
+            match = SONG_ID_PATTERN.search(item["href"])
+            if match:
+                self._known_song_ids.add(match.group(1))
+
+        self.source = self.browser_session.browser_context if self.whole_context else self.page
+        self.source.on("response", self._on_response)
+        return self
+
+    def stop(self):
+        if self.source is not None:
+            self.source.remove_listener("response", self._on_response)
+            self.source = None
+
+    def expect(self, expected_clips):
+        """Change how many clips make the generation finished, e.g. after some submissions failed"""
+
+        self.expected_clips = expected_clips
+        self._check_done()
+
+    async def _on_response(self, response):
+        if "/api/" not in response.url or "json" not in response.headers.get("content-type", ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+
+        for clip in _find_clips(payload):
+            if clip["id"] in self._known_song_ids or self._created_before_start(clip):
+                continue
+            self.clips[clip["id"]] = _clip_metadata(clip)
+        self._check_done()
+
+    def _created_before_start(self, clip):
+        try:
+            created = datetime.fromisoformat(str(clip["created_at"]).replace("Z", "+00:00")).timestamp()
+        except (KeyError, ValueError):
+            return False
+        # Allow for clock skew between us and Suno
+        return created < self.started - 60
+
+    def _check_done(self):
+        if self.future.done() or not self.clips:
+            return
+
+        statuses = [clip["status"] for clip in self.clips.values()]
+        if any(status in FAILED_STATUSES for status in statuses):
+            self.future.set_exception(RuntimeError(f"Generation failed: {list(self.clips.values())}"))
+        elif len(self.clips) >= self.expected_clips and all(status in DONE_STATUSES for status in statuses):
+            self.future.set_result(list(self.clips.values()))
+
+    async def _probe_dom(self):
+        # With whole_context the new songs show up in the tabs that submitted them
+        pages = self.browser_session.browser_context.pages if self.whole_context else [self.page]
+        finished = {}
+        for page in pages:
+            if page.is_closed():
+                continue
+            try:
+                items = await page.evaluate(DOM_PROBE_SCRIPT)
+            except Exception:
+                # Tab closed or navigating while probed
+                continue
+            for item in items:
+                match = SONG_ID_PATTERN.search(item["href"])
+                if match and match.group(1) not in self._known_song_ids and item["duration"]:
+                    finished[match.group(1)] = {"id": match.group(1), "title": item["title"], "status": "complete",
+                                                "audio_url": None, "image_url": None, "duration": item["duration"]}
+        return list(finished.values())
+
+    async def wait(self, timeout=600, initial_delay=5.0, max_delay=60.0):
+        """Wait for the generation, returning the finished clips' metadata"""
+
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Generation not finished after {timeout}s")
+                try:
+                    return await asyncio.wait_for(asyncio.shield(self.future), timeout=min(delay, remaining))
+                except asyncio.TimeoutError:
+                    pass
+
+                # Network has been quiet for a while, check the page itself
+                finished = await self._probe_dom()
+                if len(finished) >= self.expected_clips and not self.future.done():
+                    self.future.set_result(finished)
+                delay = min(delay * 2, max_delay)
+        finally:
+            self.stop()
+
+    def elapsed(self):
+        return time.time() - self.started if self.started else 0.0
+
+def print_finished_clips(clips, elapsed=None):
+    """Print the metadata of finished clips"""
+
+    suffix = f" after {elapsed:.0f}s" if elapsed is not None else ""
+    print(f"\n🎉 Generation finished{suffix}:")
+    for clip in clips:
+        print(f"   🎵 {clip.get('title') or clip['id']} - https://suno.com/song/{clip['id']}")
+        if clip.get("audio_url"):
+            print(f"      {clip['audio_url']}")
@@ -0,0 +1,145 @@
+# llm_cache.py
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from browser_use.llm.views import ChatInvokeCompletion
+from tracing import record_llm_call
+
+LLM_CACHE_DIR = Path.home() / ".suno_llm_cache"
+LLM_CACHE_MAX_BYTES = int(os.getenv("SUNO_LLM_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+# browser_use stamps every step with the wall clock; it must not break cache keys
+VOLATILE_PATTERNS = [
+    (re.compile(r"Current date and time: \d{4}-\d{2}-\d{2} \d{2}:\d{2}"), "Current date and time: <now>")
+]
+
+def _normalize(value):
+    """Drop screenshot payloads and volatile text so equal page states hash equally"""
+
+    if isinstance(value, dict):
+        if value.get("type") == "image_url":
+            return {"type": "image_url"}
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, str):
+        for pattern, replacement in VOLATILE_PATTERNS:
+            value = pattern.sub(replacement, value)
+    return value
+
+def cache_key(model, temperature, messages, output_format=None):
+    """Hash of model, temperature, messages (including the serialized page state) and output schema"""
+
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "messages": _normalize([message.model_dump() for message in messages]),
+        "output_format": output_format.__name__ if output_format else None,
+        "schema": output_format.model_json_schema() if output_format else None
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+class LLMResponseCache:
+    """Size-bounded on-disk LRU of LLM responses, one JSON file per key"""
+
+    def __init__(self, cache_dir=LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        # key -> [size, last_used]
+        self.index = {}
+        for path in self.cache_dir.glob("*.json"):
+            stat = path.stat()
+            self.index[path.stem] = [stat.st_size, stat.st_mtime]
+        self.total_bytes = sum(size for size, _ in self.index.values())
+
+    def get(self, key):
+        path = self.cache_dir / f"{key}.json"
+        if key not in self.index:
+            self.stats["misses"] += 1
+            return None
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            self._drop(key)
+            self.stats["misses"] += 1
+            return None
+
+        now = time.time()
+        self.index[key][1] = now
+        os.utime(path, (now, now))
+        self.stats["hits"] += 1
+        return data
+
+    def put(self, key, data):
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
+
+        if key in self.index:
+            self.total_bytes -= self.index[key][0]
+        size = path.stat().st_size
+        self.index[key] = [size, time.time()]
+        self.total_bytes += size
+        self._evict()
+
+    def _drop(self, key):
+        size, _ = self.index.pop(key, (0, 0))
+        self.total_bytes -= size
+        (self.cache_dir / f"{key}.json").unlink(missing_ok=True)
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self.index.items(), key=lambda item: item[1][1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._drop(key)
+            self.stats["evictions"] += 1
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def print_stats(self):
+        print(
+            f"💽 LLM cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+            f"({self.hit_rate() * 100:.0f}% hit rate), {self.stats['evictions']} evictions, "
+            f"{self.total_bytes / 1e6:.1f}MB on disk"
+        )
+
+class CachedChatModel:
+    """Chat model wrapper that answers repeated inputs from an LLMResponseCache"""
+
+    def __init__(self, llm, cache):
+        self.llm = llm
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    async def ainvoke(self, messages, output_format=None):
+        key = cache_key(self.llm.model, self.llm.temperature, messages, output_format)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            completion = cached["completion"]
+            if output_format is not None:
+                completion = output_format.model_validate(completion)
+            # A cached answer costs no tokens
+            record_llm_call(0.0, cached=True)
+            return ChatInvokeCompletion(completion=completion, usage=None)
+
+        response = await self.llm.ainvoke(messages, output_format)
+
+        completion = response.completion
+        if output_format is not None:
+            completion = completion.model_dump(mode="json")
+        self.cache.put(key, {"model": self.llm.model, "completion": completion, "created": time.time()})
+        return response
@@ -0,0 +1,261 @@
+# llm_client.py
+import asyncio
+import json
+import os
+import random
+import time
+import httpx
+from browser_use.llm import ChatOpenAI
+from browser_use.llm.exceptions import ModelProviderError
+from llm_cache import CachedChatModel, LLMResponseCache
+from tracing import record_llm_call
+
+# Process-wide limits; override with environment variables
+REQUESTS_PER_MINUTE = int(os.getenv("SUNO_LLM_RPM", "500"))
+TOKENS_PER_MINUTE = int(os.getenv("SUNO_LLM_TPM", "200000"))
+MAX_CONNECTIONS = int(os.getenv("SUNO_LLM_MAX_CONNECTIONS", "20"))
+MAX_RETRIES = int(os.getenv("SUNO_LLM_MAX_RETRIES", "6"))
+USE_RESPONSE_CACHE = os.getenv("SUNO_LLM_CACHE", "").lower() in ("1", "true", "yes")
+
+# Rough prompt-size estimate used to reserve tokens before the real usage is known
+CHARS_PER_TOKEN = 4
+EXPECTED_COMPLETION_TOKENS = 500
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Async token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        # Requests bigger than the bucket would wait forever, clamp them
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount):
+        """Give back (positive) or take (negative) tokens once real usage is known"""
+
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class SharedLLMState:
+    """Pooled HTTP client, rate limiters and counters shared by every LLM in the process"""
+
+    def __init__(self):
+        self.requests = TokenBucket(REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(TOKENS_PER_MINUTE)
+        self.paused_until = 0.0
+        self.http_client = None
+        self._http_loop = None
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "queued_seconds": 0.0,
+            "model_seconds": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0
+        }
+
+    def get_http_client(self):
+        # httpx clients are bound to the loop they were first used on
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self.http_client is None or self._http_loop is not loop or self.http_client.is_closed:
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                timeout=httpx.Timeout(120.0, connect=10.0)
+            )
+            self._http_loop = loop
+        return self.http_client
+
+    async def wait_for_pause(self):
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause_all(self, attempt):
+        """Back off every caller together after a rate limit, with full jitter"""
+
+        delay = random.uniform(0, min(60.0, 2.0 ** attempt))
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+_shared = SharedLLMState()
+
+def _provider_failure(error):
+    """(status code, transient) for a ModelProviderError raised by the OpenAI client
+
+    browser_use wraps every failure in ModelProviderError, schema and JSON
+    validation errors included (as status 502). Only errors caused by an
+    HTTP response or a lost connection are the provider's; the rest are
+    (None, False) and not worth retrying.
+    """
+
+    import openai
+
+    cause = error.__cause__
+    if isinstance(cause, openai.APIStatusError):
+        return cause.status_code, cause.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(cause, openai.APIConnectionError):
+        return None, True
+    if cause is None and len(error.args) > 1:
+        # Raised directly (e.g. by a stand-in model), trust its status code
+        return error.args[1], error.args[1] in RETRYABLE_STATUS_CODES
+    return None, False
+
+def _estimate_tokens(messages):
+    text = json.dumps([message.model_dump() for message in messages], default=str)
+    return len(text) // CHARS_PER_TOKEN + EXPECTED_COMPLETION_TOKENS
+
+class RateLimitedChatModel:
+    """ChatOpenAI wrapper that goes through the shared limiter and retry policy"""
+
+    def __init__(self, llm, shared=None):
+        self.llm = llm
+        self.shared = shared or _shared
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    async def ainvoke(self, messages, output_format=None):
+        shared = self.shared
+        estimate = _estimate_tokens(messages)
+
+        for attempt in range(MAX_RETRIES + 1):
+            queued = time.perf_counter()
+            await shared.wait_for_pause()
+            await shared.requests.acquire(1)
+            await shared.tokens.acquire(estimate)
+            shared.stats["queued_seconds"] += time.perf_counter() - queued
+
+            started = time.perf_counter()
+            try:
+                response = await self.llm.ainvoke(messages, output_format)
+            except ModelProviderError as e:
+                shared.stats["model_seconds"] += time.perf_counter() - started
+                status_code, transient = _provider_failure(e)
+                if not transient or attempt == MAX_RETRIES:
+                    shared.stats["errors"] += 1
+                    raise
+                shared.stats["retries"] += 1
+                if status_code is None:
+                    # Connection dropped: retry this call alone, the provider isn't pushing back
+                    await asyncio.sleep(random.uniform(0, min(10.0, 2.0 ** attempt)))
+                    continue
+                if status_code == 429:
+                    shared.stats["rate_limited"] += 1
+                shared.pause_all(attempt)
+                continue
+
+            model_seconds = time.perf_counter() - started
+            shared.stats["model_seconds"] += model_seconds
+            shared.stats["calls"] += 1
+            record_llm_call(model_seconds, response.usage)
+            if response.usage is not None:
+                used = response.usage.prompt_tokens + response.usage.completion_tokens
+                shared.stats["prompt_tokens"] += response.usage.prompt_tokens
+                shared.stats["completion_tokens"] += response.usage.completion_tokens
+                shared.tokens.adjust(estimate - used)
+            return response
+
+_response_cache = None
+_llm_factory = None
+
+def set_llm_factory(factory):
+    """Build models with factory(model, temperature) instead of ChatOpenAI (None restores it)
+
+    Used to run the flows offline against a scripted stand-in model.
+    """
+
+    global _llm_factory
+    _llm_factory = factory
+
+def get_response_cache():
+    """Process-wide on-disk LLM response cache"""
+
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = LLMResponseCache()
+    return _response_cache
+
+def get_llm(model="gpt-4o-mini", temperature=None, cache=None):
+    """Process-wide LLM factory: pooled HTTP connections and shared rate limiting
+
+    With cache (default: SUNO_LLM_CACHE env var), identical model inputs are
+    answered from the on-disk response cache before reaching the limiter.
+    """
+
+    if _llm_factory is not None:
+        llm = _llm_factory(model, temperature)
+    else:
+        llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=_shared.get_http_client(),
+            # Retries are coordinated by RateLimitedChatModel instead of per client
+            max_retries=0
+        )
+    llm = RateLimitedChatModel(llm)
+
+    if cache is None:
+        cache = USE_RESPONSE_CACHE
+    if cache:
+        llm = CachedChatModel(llm, get_response_cache())
+    return llm
+
+async def warm_llm_connection():
+    """Open the pooled connection to the API ahead of the first call; returns seconds spent
+
+    A model list request costs no tokens but pays DNS, TCP and TLS setup, so
+    the next agent's first step starts on a live keep-alive connection.
+    """
+
+    if _llm_factory is not None:
+        return 0.0
+    started = time.perf_counter()
+    base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+    try:
+        await _shared.get_http_client().get(
+            f"{base_url}/models", headers={"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', '')}"}
+        )
+    except httpx.HTTPError as e:
+        print(f"⚠️ Could not warm the LLM connection: {type(e).__name__}")
+    return time.perf_counter() - started
+
+def llm_stats():
+    return dict(_shared.stats)
+
+def print_llm_stats():
+    if _response_cache is not None:
+        _response_cache.print_stats()
+
+    stats = _shared.stats
+    if not stats["calls"] and not stats["errors"]:
+        return
+    print(
+        f"🧠 LLM: {stats['calls']} call(s), {stats['retries']} retries ({stats['rate_limited']} rate limited), "
+        f"queued {stats['queued_seconds']:.1f}s vs model {stats['model_seconds']:.1f}s, "
+        f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens"
+    )
@@ -0,0 +1,111 @@
+# mic_preflight.py
+import asyncio
+import time
+from browser_use import BrowserProfile, BrowserSession
+
+SUNO_CREATE_URL = "https://suno.com/create"
+
+# Evaluated in the page over CDP; resolves to a plain JSON object
+PREFLIGHT_SCRIPT = """
+(async () => {
+    const out = {secure_context: window.isSecureContext, media_devices: !!navigator.mediaDevices};
+    try {
+        out.permission = (await navigator.permissions.query({name: 'microphone'})).state;
+    } catch (e) {
+        out.permission = 'unsupported';
+    }
+    try {
+        const devices = await navigator.mediaDevices.enumerateDevices();
+        out.audio_inputs = devices.filter(d => d.kind === 'audioinput').length;
+    } catch (e) {
+        out.audio_inputs = null;
+    }
+    try {
+        const stream = await navigator.mediaDevices.getUserMedia({audio: true});
+        out.granted = true;
+        out.tracks = stream.getAudioTracks().map(t => t.label);
+        stream.getTracks().forEach(t => t.stop());
+    } catch (e) {
+        out.granted = false;
+        out.error = `${e.name}: ${e.message}`;
+    }
+    return out;
+})()
+"""
+
+async def microphone_preflight(browser_session=None, url=SUNO_CREATE_URL, profile_dir=None, browser_args=None, timeout=5.0,
+                               headless=False):
+    """Check microphone permission and getUserMedia directly over the DevTools protocol
+
+    Prefer passing the session the agents will use: its permission state is
+    the one that matters. Otherwise a short-lived browser is launched on
+    profile_dir (headed by default, since headless permissions differ).
+    Returns a dict with "ok", the permission state, the getUserMedia
+    outcome, "headless" and "elapsed_ms"; any failure, including the browser
+    not starting, comes back as granted=None with the error.
+    """
+
+    started = time.perf_counter()
+    own_session = browser_session is None
+
+    if own_session:
+        browser_session = BrowserSession(
+            browser_profile=BrowserProfile(
+                user_data_dir=profile_dir,
+                headless=headless,
+                args=browser_args or []
+            )
+        )
+
+    try:
+        await browser_session.start()
+        page = await browser_session.get_current_page()
+        if not page.url.startswith(url):
+            await page.goto(url, wait_until="domcontentloaded")
+
+        cdp = await page.context.new_cdp_session(page)
+        try:
+            response = await asyncio.wait_for(
+                cdp.send("Runtime.evaluate", {
+                    "expression": PREFLIGHT_SCRIPT,
+                    "awaitPromise": True,
+                    "returnByValue": True
+                }),
+                timeout=timeout
+            )
+        finally:
+            await cdp.detach()
+
+        if "exceptionDetails" in response:
+            result = {"granted": False, "error": response["exceptionDetails"].get("text", "evaluation failed")}
+        else:
+            result = response["result"].get("value") or {}
+    except asyncio.TimeoutError:
+        # getUserMedia never settled, which means a permission prompt is waiting
+        result = {"granted": False, "permission": "prompt", "error": f"getUserMedia timed out after {timeout}s"}
+    except Exception as e:
+        result = {"granted": None, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        if own_session:
+            try:
+                await browser_session.kill()
+            except Exception:
+                pass
+
+    result["ok"] = bool(result.get("granted"))
+    result["headless"] = bool(browser_session.browser_profile.headless)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+def print_preflight(result):
+    """Print a microphone preflight result"""
+
+    icon = "✅" if result["ok"] else "❌"
+    mode = ", headless" if result.get("headless") else ""
+    print(f"{icon} Microphone preflight ({result['elapsed_ms']:.0f}ms{mode}): "
+          f"permission={result.get('permission', 'unknown')}, "
+          f"inputs={result.get('audio_inputs', 'unknown')}, granted={result.get('granted')}")
+    if result.get("error"):
+        print(f"   Error: {result['error']}")
+    if result.get("headless"):
+        print("   ⚠️ Ran headless: permissions and devices may differ from a headed browser")
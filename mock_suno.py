@@ -0,0 +1,346 @@
+# mock_suno.py
+import asyncio
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from browser_use.llm.views import ChatInvokeCompletion, ChatInvokeUsage
+
+# Stand-in for suno.com/create with the controls the flows drive
+MOCK_CREATE_PAGE = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Create | Suno (mock)</title>
+<style>
+    body { font-family: sans-serif; margin: 2em; }
+    #recorder { display: none; margin: 1em 0; }
+    #record-button { background: #e22; color: white; border-radius: 50%; width: 3em; height: 3em; }
+    #songs a { display: block; margin: .5em 0; }
+</style>
+</head>
+<body>
+<div id="modes">
+    <button type="button" id="upload-mode">Upload</button>
+    <button type="button" id="record-mode">Record</button>
+    <button type="button" id="song-mode">Song</button>
+</div>
+<div id="recorder">
+    <button type="button" id="record-button" aria-label="Start recording">&#9679;</button>
+    <span id="timer">00:00</span>
+    <button type="button" id="stop-button">Stop</button>
+</div>
+<div id="settings">
+    <label><input type="checkbox" id="instrumental" aria-label="Instrumental"> Instrumental</label>
+    <textarea id="prompt" placeholder="Describe a song" rows="3" cols="50"></textarea>
+    <button type="button" id="create-button">Create</button>
+</div>
+<div id="songs"></div>
+<script>
+    let startedAt = null, ticker = null;
+    const timer = document.getElementById('timer');
+    document.getElementById('record-mode').onclick = () => {
+        document.getElementById('recorder').style.display = 'block';
+    };
+    document.getElementById('record-button').onclick = () => {
+        startedAt = Date.now();
+        ticker = setInterval(() => {
+            const s = Math.floor((Date.now() - startedAt) / 1000);
+            timer.textContent = `${String(Math.floor(s / 60)).padStart(2, '0')}:${String(s % 60).padStart(2, '0')}`;
+        }, 200);
+    };
+    document.getElementById('stop-button').onclick = () => {
+        clearInterval(ticker);
+        startedAt = null;
+    };
+    document.getElementById('create-button').onclick = async () => {
+        const response = await fetch('/api/generate', {
+            method: 'POST',
+            headers: {'content-type': 'application/json'},
+            body: JSON.stringify({
+                prompt: document.getElementById('prompt').value,
+                instrumental: document.getElementById('instrumental').checked
+            })
+        });
+        const {clips} = await response.json();
+        const songs = document.getElementById('songs');
+        clips.forEach(clip => {
+            const link = document.createElement('a');
+            link.href = `/song/${clip.id}`;
+            link.id = `song-${clip.id}`;
+            link.textContent = clip.title;
+            songs.appendChild(link);
+        });
+        setTimeout(async () => {
+            const feed = await (await fetch(`/api/feed?ids=${clips.map(c => c.id).join(',')}`)).json();
+            feed.clips.forEach(clip => {
+                const link = document.getElementById(`song-${clip.id}`);
+                link.textContent = `${clip.title} 0:${String(Math.round(clip.metadata.duration)).padStart(2, '0')}`;
+                const audio = document.createElement('audio');
+                audio.src = clip.audio_url;
+                link.after(audio);
+            });
+        }, GENERATION_MS);
+    };
+</script>
+</body>
+</html>
+"""
+
+# Intent -> visible label of the matching control on the mock page
+MOCK_LABELS = {
+    "record_mode_button": "Record",
+    "red_record_button": "Start recording",
+    "stop_button": "Stop",
+    "instrumental_toggle": "Instrumental",
+    "prompt_field": "Describe a song",
+    "generate_button": "Create"
+}
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+class MockSunoServer:
+    """Local HTTP server for the mock create page and its generate/feed API"""
+
+    def __init__(self, generation_seconds=2.0, audio_bytes=256 * 1024, host="127.0.0.1", port=0):
+        self.generation_seconds = generation_seconds
+        self.audio_bytes = audio_bytes
+        self.clips = {}
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, payload):
+                self._send(200, json.dumps(payload).encode(), "application/json")
+
+            def do_GET(self):
+                server.requests += 1
+                url = urlparse(self.path)
+                if url.path in ("/", "/create"):
+                    page = MOCK_CREATE_PAGE.replace("GENERATION_MS", str(int(server.generation_seconds * 1000)))
+                    self._send(200, page.encode(), "text/html; charset=utf-8")
+                elif url.path == "/api/feed":
+                    ids = parse_qs(url.query).get("ids", [""])[0].split(",")
+                    self._send_json({"clips": [server.finish_clip(clip_id) for clip_id in ids if clip_id in server.clips]})
+                elif url.path.startswith("/audio/"):
+                    self._send(200, os.urandom(server.audio_bytes), "audio/mpeg")
+                elif url.path.startswith("/song/"):
+                    self._send(200, b"<html><body>song</body></html>", "text/html")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def do_POST(self):
+                server.requests += 1
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if urlparse(self.path).path == "/api/generate":
+                    self._send_json({"clips": [server.new_clip(body, n) for n in range(2)]})
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def create_url(self):
+        return f"{self.base_url}/create"
+
+    def new_clip(self, request, n):
+        clip = {
+            "id": str(uuid.uuid4()),
+            "title": f"Mock extension {n + 1}",
+            "status": "submitted",
+            "created_at": _now_iso(),
+            "prompt": request.get("prompt"),
+            "audio_url": None,
+            "metadata": {"duration": None}
+        }
+        self.clips[clip["id"]] = clip
+        return clip
+
+    def finish_clip(self, clip_id):
+        clip = self.clips[clip_id]
+        clip.update(status="complete", audio_url=f"{self.base_url}/audio/{clip_id}.mp3", metadata={"duration": 8.0})
+        return clip
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+ELEMENT_LINE = re.compile(r"^\s*\*?\[(\d+)\]<")
+QUOTED_TEXT = re.compile(r'(?:enter|Type):?\s*"([^"]+)"')
+
+def find_element(page_state, label):
+    """Index of the interactive element whose text or attribute value is label"""
+
+    pattern = re.compile(rf"[>=]{re.escape(label)}(?:\s|>|/|$)", re.IGNORECASE)
+    for line in page_state.splitlines():
+        match = ELEMENT_LINE.match(line)
+        if match and pattern.search(line):
+            return int(match.group(1))
+    return None
+
+def _playbook(task):
+    """Scripted steps for a flow's task: (action, target, argument) tuples
+
+    Matching is case-insensitive so verbose and compact (prompt budget)
+    wordings of a task pick the same steps.
+    """
+
+    lowered = task.lower()
+    if "set up guitar recording" in lowered:
+        return [("click", "Record", None), ("done", "Recording interface is ready", None)]
+
+    if "record a guitar session" in lowered:
+        match = re.search(r"wait for exactly (\d+) seconds", lowered)
+        seconds = min(int(match.group(1)), 10) if match else 3
+        return [
+            ("click", "Start recording", None),
+            ("wait", None, seconds),
+            ("click", "Stop", None),
+            ("done", "RECORDING STOPPED", None)
+        ]
+
+    if "find the recording controls" in lowered:
+        return [
+            ("remember", "red_record_button", MOCK_LABELS["red_record_button"]),
+            ("remember", "stop_button", MOCK_LABELS["stop_button"]),
+            ("done", "Controls remembered", None)
+        ]
+
+    if "set up the ai extension" in lowered or "continue after file upload" in lowered:
+        match = QUOTED_TEXT.search(task)
+        return [
+            ("click", "Instrumental", None),
+            ("input", "Describe a song", match.group(1) if match else "add drums and bass"),
+            ("click", "Create", None),
+            ("done", "Generation started", None)
+        ]
+
+    # Look-ahead resolution: remember every listed element without acting
+    if "do not click" in lowered:
+        intents = re.findall(r'remember_element with intent "(\w+)"', task)
+        steps = [("remember", intent, MOCK_LABELS.get(intent, intent)) for intent in intents]
+        return steps + [("done", "Elements remembered", None)]
+
+    # The mock goes straight from recording to the prompt, there is no next/continue button
+    if 'intent "next_button"' in task:
+        return [("done", "No next or continue button on the page", None)]
+
+    # Selector cache fallback: remember the element for one intent, then act on it
+    match = re.search(r'remember_element with intent "(\w+)"', task)
+    if match:
+        intent = match.group(1)
+        label = MOCK_LABELS.get(intent, intent)
+        steps = [("remember", intent, label)]
+        text = QUOTED_TEXT.search(task)
+        if text:
+            steps.append(("input", label, text.group(1)))
+        else:
+            steps.append(("click", label, None))
+        return steps + [("done", f"{intent} done", None)]
+
+    return [("done", "Nothing scripted for this task", None)]
+
+class ScriptedLLM:
+    """Stand-in chat model that plays back a fixed script per flow, for offline benchmarks
+
+    Every step reads the task and the serialized page out of the latest
+    state message and answers with the next scripted action, so the agents
+    exercise the real browser and DOM pipeline without a model provider.
+    """
+
+    provider = "scripted"
+
+    def __init__(self, base_url, model="scripted", temperature=None, latency=0.0):
+        self.base_url = base_url
+        self.model = model
+        self.model_name = model
+        self.name = model
+        self.temperature = temperature
+        self.latency = latency
+        self.position = 0
+
+    def _next_action(self, state_text):
+        task = state_text.split("<user_request>", 1)[-1].split("</user_request>", 1)[0]
+        tab = re.search(r"^Tab \d+: (\S+)", state_text, re.MULTILINE)
+        if tab and not tab.group(1).startswith(self.base_url):
+            return {"go_to_url": {"url": f"{self.base_url}/create", "new_tab": False}}
+
+        steps = _playbook(task)
+        action, target, argument = steps[min(self.position, len(steps) - 1)]
+        self.position += 1
+
+        if action == "done":
+            return {"done": {"text": target, "success": True}}
+        if action == "wait":
+            return {"wait": {"seconds": argument}}
+
+        label = argument if action == "remember" else target
+        index = find_element(state_text, label)
+        if index is None:
+            return {"done": {"text": f"Could not find {label!r} on the page", "success": False}}
+        if action == "remember":
+            return {"remember_element": {"intent": target, "index": index}}
+        if action == "input":
+            return {"input_text": {"index": index, "text": argument}}
+        return {"click_element_by_index": {"index": index}}
+
+    async def ainvoke(self, messages, output_format=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        state_text = messages[-1].text
+        prompt_tokens = sum(len(message.text) for message in messages) // 4
+
+        if output_format is None:
+            completion, completion_tokens = "ok", 1
+        else:
+            action = self._next_action(state_text)
+            completion = output_format.model_validate({
+                "evaluation_previous_goal": "Scripted",
+                "memory": f"Scripted step {self.position}",
+                "next_goal": next(iter(action)),
+                "action": [action]
+            })
+            completion_tokens = len(completion.model_dump_json()) // 4
+
+        usage = ChatInvokeUsage(
+            prompt_tokens=prompt_tokens,
+            prompt_cached_tokens=None,
+            prompt_cache_creation_tokens=None,
+            prompt_image_tokens=None,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens
+        )
+        return ChatInvokeCompletion(completion=completion, usage=usage)
+
+def scripted_llm_factory(base_url, latency=0.0):
+    """get_llm() factory for llm_client.set_llm_factory()"""
+
+    return lambda model, temperature: ScriptedLLM(base_url, model=f"scripted-{model}", temperature=temperature, latency=latency)
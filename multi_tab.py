@@ -0,0 +1,94 @@
+# multi_tab.py
+import asyncio
+import os
+import time
+from generation_waiter import GenerationWaiter
+from tracing import traced
+
+# Tabs driven by an agent at the same time; the rest queue for a slot
+TAB_CONCURRENCY = int(os.getenv("SUNO_TAB_CONCURRENCY", "3"))
+
+async def open_tab(browser_session, url):
+    """A new tab in the session's (logged-in) browser context, as a session its agents can drive
+
+    The returned session shares the browser with browser_session but does
+    not own it, so agents finishing on it never close the browser.
+    """
+
+    page = await browser_session.browser_context.new_page()
+    await page.goto(url)
+    await page.wait_for_load_state("domcontentloaded")
+
+    tab_session = browser_session.model_copy()
+    tab_session.agent_current_page = page
+    tab_session.human_current_page = page
+    return tab_session
+
+async def _run_tab(index, prompt, browser_session, submit, url, slots, open_pages):
+    """Submit from a new tab; the tab is added to open_pages and left open for its feed polling"""
+
+    result = {"tab": index, "prompt": prompt, "error": None}
+    try:
+        async with slots:
+            started = time.perf_counter()
+            tab_session = await open_tab(browser_session, url)
+            open_pages.append(tab_session.agent_current_page)
+            print(f"🗂️  Tab {index}: submitting '{prompt}'")
+            await submit(prompt, tab_session)
+            result["submit_seconds"] = round(time.perf_counter() - started, 2)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        print(f"❌ Tab {index}: {result['error']}")
+    return result
+
+async def _close_pages(pages):
+    for page in pages:
+        if not page.is_closed():
+            await page.close()
+
+@traced("generate_in_tabs")
+async def generate_in_tabs(prompts, browser_session, submit, url, concurrency=TAB_CONCURRENCY, wait=True, timeout=600):
+    """Submit one generation per prompt, each in its own tab of one browser
+
+    submit(prompt, tab_session) does the prompt-and-generate step in a tab
+    (e.g. set_extension_prompt_and_generate). Every tab opens url fresh, so
+    it must hold everything a generation needs: page state such as a
+    recording made in another tab is not carried over. At most
+    `concurrency` tabs are driven at once.
+
+    Returns (results, clips): one result per prompt with its submit time or
+    error, and, when wait is set, the finished clips of all tabs. Tabs see
+    each other's clips in the feed, so one waiter watches the whole browser
+    context for two clips per submitted prompt. The tabs stay open until
+    then, since each submitting page is what polls the feed.
+    """
+
+    waiter = None
+    if wait:
+        # Listen before any tab clicks generate
+        waiter = await GenerationWaiter(browser_session, expected_clips=2 * len(prompts), whole_context=True).start()
+
+    slots = asyncio.Semaphore(max(1, concurrency))
+    open_pages = []
+    started = time.perf_counter()
+    clips = []
+    try:
+        results = await asyncio.gather(*[
+            _run_tab(index, prompt, browser_session, submit, url, slots, open_pages)
+            for index, prompt in enumerate(prompts, 1)
+        ])
+
+        failed = sum(result["error"] is not None for result in results)
+        print(f"🗂️  {len(prompts)} tab(s) submitted in {time.perf_counter() - started:.1f}s "
+              f"({failed} failed, up to {concurrency} at once)")
+
+        if waiter is not None and failed < len(prompts):
+            # Only submitted generations will produce clips
+            waiter.expect(2 * (len(prompts) - failed))
+            clips = await waiter.wait(timeout=timeout)
+            print(f"✅ {len(clips)} clip(s) after {waiter.elapsed():.0f}s")
+    finally:
+        if waiter is not None:
+            waiter.stop()
+        await _close_pages(open_pages)
+    return results, clips
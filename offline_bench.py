@@ -0,0 +1,342 @@
+# offline_bench.py
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+import psutil
+import prompt_budget
+import tracing
+from llm_client import set_llm_factory, print_llm_stats
+from mock_suno import MockSunoServer, scripted_llm_factory
+from suno_session import open_suno_session, close_suno_session
+from selector_cache import SelectorCache
+from generation_waiter import GenerationWaiter
+from track_downloader import download_tracks
+from basic_suno_test import start_guitar_recording, record_guitar_session, set_extension_prompt_and_generate
+from multi_tab import generate_in_tabs
+from file_upload import manual_upload_continuation
+
+# A flow more than this much slower than the baseline is reported as a regression
+REGRESSION_THRESHOLD = 0.2
+
+def _rss_mb():
+    """Resident memory of this process plus its browser children, in MB"""
+
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total / 1e6
+
+async def _sample_peak_rss(peak, interval=0.1):
+    while True:
+        peak[0] = max(peak[0], _rss_mb())
+        await asyncio.sleep(interval)
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * (len(ordered) - 1))))]
+
+def _read_spans(trace_path, offset):
+    with open(trace_path) as f:
+        f.seek(offset)
+        return [json.loads(line) for line in f if line.strip()]
+
+async def _generate_and_download(session, archive_dir):
+    waiter = await GenerationWaiter(session).start()
+    await set_extension_prompt_and_generate("add drums and bass", browser_session=session)
+    clips = await waiter.wait(timeout=60, initial_delay=1.0)
+    return await download_tracks(session, clips, prompt="add drums and bass", archive_dir=archive_dir)
+
+async def _open_recorder(session):
+    """Untimed setup for the record flow: the mock's recorder stays hidden until Record is clicked"""
+
+    page = await session.get_current_page()
+    await page.click("#record-mode")
+    await page.wait_for_selector("#record-button", state="visible")
+
+def bench_flows(work_dir, record_seconds):
+    """(name, step(browser_session), setup(browser_session) or None), in the order a jam session runs them
+
+    Each flow starts on a freshly loaded create page; setup brings it to the
+    state the flow expects before the timer starts.
+    """
+
+    cache = SelectorCache(Path(work_dir) / "selector_cache.json")
+    archive_dir = Path(work_dir) / "archive"
+
+    return [
+        ("start_guitar_recording", lambda session: start_guitar_recording(browser_session=session, replay=False),
+         None),
+        ("record_guitar_session", lambda session: record_guitar_session(
+            record_seconds, browser_session=session, precise_timing=True), _open_recorder),
+        ("set_extension_prompt_and_generate", lambda session: _generate_and_download(session, archive_dir), None),
+        ("start_guitar_recording (selector cache)", lambda session: start_guitar_recording(
+            browser_session=session, selector_cache=cache), None),
+        ("manual_upload_continuation (selector cache)", lambda session: manual_upload_continuation(
+            browser_session=session, selector_cache=cache), None),
+        ("manual_upload_continuation (warm cache)", lambda session: manual_upload_continuation(
+            browser_session=session, selector_cache=cache), None)
+    ]
+
+async def run_benchmark(runs=3, llm_latency=0.0, generation_seconds=2.0, record_seconds=3, budget=False):
+    """Drive the flows against the mock Suno page with the scripted LLM
+
+    Returns a report with browser startup, per-flow wall time, agent step
+    latency and prompt tokens per step (from the trace spans) and peak
+    memory, over `runs` fresh browsers. budget runs with prompt_budget on.
+    """
+
+    default_budget = prompt_budget.PROMPT_BUDGET
+    prompt_budget.enable(budget)
+    server = MockSunoServer(generation_seconds=generation_seconds).start()
+    set_llm_factory(scripted_llm_factory(server.base_url, latency=llm_latency))
+
+    work_dir = tempfile.mkdtemp(prefix="suno_bench_")
+    trace_path = Path(work_dir) / "traces.jsonl"
+    trace_path.touch()
+    default_trace_path = tracing.TRACE_PATH
+    tracing.TRACE_PATH = trace_path
+
+    startups = []
+    flows = {}
+    try:
+        for run in range(runs):
+            print(f"\n🏁 Benchmark run {run + 1}/{runs}")
+            session, cold_start = await open_suno_session(
+                str(Path(work_dir) / f"profile-{run}"), headless=True, url=server.create_url
+            )
+            startups.append(cold_start)
+            print(f"🌐 Browser ready in {cold_start:.2f}s")
+
+            try:
+                for name, step, setup in bench_flows(work_dir, record_seconds):
+                    page = await session.get_current_page()
+                    await page.goto(server.create_url)
+                    await page.wait_for_load_state("domcontentloaded")
+                    if setup is not None:
+                        await setup(session)
+
+                    offset = trace_path.stat().st_size
+                    peak = [_rss_mb()]
+                    sampler = asyncio.create_task(_sample_peak_rss(peak))
+                    started = time.perf_counter()
+                    error = None
+                    try:
+                        await step(session)
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}"
+                        print(f"❌ {name}: {error}")
+                    finally:
+                        sampler.cancel()
+                    wall = time.perf_counter() - started
+
+                    spans = _read_spans(trace_path, offset)
+                    result = flows.setdefault(
+                        name, {"wall": [], "steps": [], "prompt_tokens": [], "peak_rss_mb": 0.0, "errors": 0}
+                    )
+                    result["wall"].append(wall)
+                    step_spans = [span for span in spans if span["type"] == "step"]
+                    result["steps"].extend(span["wall_seconds"] for span in step_spans)
+                    result["prompt_tokens"].extend(span["prompt_tokens"] for span in step_spans)
+                    result["peak_rss_mb"] = max(result["peak_rss_mb"], peak[0])
+                    result["errors"] += error is not None
+            finally:
+                await close_suno_session(session)
+    finally:
+        tracing.TRACE_PATH = default_trace_path
+        prompt_budget.enable(default_budget)
+        set_llm_factory(None)
+        server.stop()
+
+    return {
+        "runs": runs,
+        "llm_latency": llm_latency,
+        "prompt_budget": budget,
+        "startup_p50_seconds": _percentile(startups, 0.5),
+        "startup_p95_seconds": _percentile(startups, 0.95),
+        "flows": {
+            name: {
+                "wall_p50_seconds": _percentile(result["wall"], 0.5),
+                "wall_p95_seconds": _percentile(result["wall"], 0.95),
+                "agent_steps": len(result["steps"]) / runs,
+                "step_p50_seconds": _percentile(result["steps"], 0.5),
+                "step_p95_seconds": _percentile(result["steps"], 0.95),
+                "prompt_tokens_per_step": (
+                    round(sum(result["prompt_tokens"]) / len(result["prompt_tokens"])) if result["prompt_tokens"] else None
+                ),
+                "peak_rss_mb": round(result["peak_rss_mb"], 1),
+                "errors": result["errors"]
+            }
+            for name, result in flows.items()
+        },
+        "work_dir": work_dir
+    }
+
+async def _measured(coroutine):
+    """(result, wall_seconds, peak_rss_mb) of awaiting coroutine"""
+
+    peak = [_rss_mb()]
+    sampler = asyncio.create_task(_sample_peak_rss(peak))
+    started = time.perf_counter()
+    try:
+        result = await coroutine
+    finally:
+        sampler.cancel()
+    return result, time.perf_counter() - started, peak[0]
+
+async def _generate_sequentially(prompts, profile_dir, url):
+    """One browser per prompt on the same profile, one after another (the profile lock allows no more)"""
+
+    clips = []
+    for prompt in prompts:
+        session, _ = await open_suno_session(profile_dir, headless=True, url=url)
+        try:
+            waiter = await GenerationWaiter(session).start()
+            await set_extension_prompt_and_generate(prompt, browser_session=session)
+            clips.extend(await waiter.wait(timeout=60, initial_delay=1.0))
+        finally:
+            await close_suno_session(session)
+    return clips
+
+async def _generate_in_tabs(prompts, profile_dir, url, concurrency):
+    session, _ = await open_suno_session(profile_dir, headless=True, url=url)
+    try:
+        _, clips = await generate_in_tabs(
+            prompts,
+            session,
+            lambda prompt, tab_session: set_extension_prompt_and_generate(prompt, browser_session=tab_session),
+            url,
+            concurrency=concurrency,
+            timeout=60
+        )
+    finally:
+        await close_suno_session(session)
+    return clips
+
+async def run_tab_comparison(tabs=3, concurrency=3, llm_latency=0.0, generation_seconds=2.0):
+    """Wall time and peak memory of N generations: sequential browsers vs concurrent tabs in one browser"""
+
+    server = MockSunoServer(generation_seconds=generation_seconds).start()
+    set_llm_factory(scripted_llm_factory(server.base_url, latency=llm_latency))
+    work_dir = tempfile.mkdtemp(prefix="suno_tabs_")
+    profile_dir = str(Path(work_dir) / "profile")
+    prompts = [f"add drums and bass, take {i}" for i in range(1, tabs + 1)]
+
+    modes = {}
+    try:
+        for mode, run in [
+            ("sequential", lambda: _generate_sequentially(prompts, profile_dir, server.create_url)),
+            ("tabs", lambda: _generate_in_tabs(prompts, profile_dir, server.create_url, concurrency))
+        ]:
+            print(f"\n🏁 {mode}: {tabs} generation(s)")
+            clips, wall, peak = await _measured(run())
+            modes[mode] = {"wall_seconds": round(wall, 2), "peak_rss_mb": round(peak, 1), "clips": len(clips)}
+    finally:
+        set_llm_factory(None)
+        server.stop()
+
+    return {"tabs": tabs, "concurrency": concurrency, "llm_latency": llm_latency, "modes": modes}
+
+def print_tab_comparison(report):
+    print(f"\n🗂️  {report['tabs']} generation(s), up to {report['concurrency']} tab(s) at once, "
+          f"scripted LLM latency {report['llm_latency']}s")
+    print(f"{'mode':<12} {'wall s':>8} {'peak MB':>8} {'clips':>6}")
+    for mode, result in report["modes"].items():
+        print(f"{mode:<12} {result['wall_seconds']:>8.2f} {result['peak_rss_mb']:>8.0f} {result['clips']:>6}")
+
+    sequential, tabs = report["modes"].get("sequential"), report["modes"].get("tabs")
+    if sequential and tabs and tabs["wall_seconds"]:
+        print(f"⚡ Tabs: {sequential['wall_seconds'] / tabs['wall_seconds']:.1f}x faster, "
+              f"{tabs['peak_rss_mb'] - sequential['peak_rss_mb']:+.0f}MB peak memory")
+
+def _seconds(value):
+    return f"{value:.2f}" if value is not None else "-"
+
+def print_benchmark(report):
+    budget = ", prompt budget on" if report.get("prompt_budget") else ""
+    print(f"\n📊 Offline benchmark ({report['runs']} run(s), scripted LLM latency {report['llm_latency']}s{budget})")
+    print(f"   Browser startup: p50 {_seconds(report['startup_p50_seconds'])}s, "
+          f"p95 {_seconds(report['startup_p95_seconds'])}s")
+    print(f"\n{'flow':<46} {'p50 s':>7} {'p95 s':>7} {'steps':>6} {'step p50':>9} {'step p95':>9} "
+          f"{'tok/step':>9} {'peak MB':>8} {'err':>4}")
+    for name, flow in report["flows"].items():
+        tokens = flow.get("prompt_tokens_per_step")
+        print(
+            f"{name:<46} {_seconds(flow['wall_p50_seconds']):>7} {_seconds(flow['wall_p95_seconds']):>7} "
+            f"{flow['agent_steps']:>6.1f} {_seconds(flow['step_p50_seconds']):>9} "
+            f"{_seconds(flow['step_p95_seconds']):>9} {tokens if tokens is not None else '-':>9} "
+            f"{flow['peak_rss_mb']:>8.0f} {flow['errors']:>4}"
+        )
+
+def compare_to_baseline(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """Names of flows (and startup) whose p50 wall time regressed past threshold"""
+
+    regressions = []
+    pairs = [("startup", report["startup_p50_seconds"], baseline.get("startup_p50_seconds"))]
+    for name, flow in report["flows"].items():
+        pairs.append((name, flow["wall_p50_seconds"], baseline.get("flows", {}).get(name, {}).get("wall_p50_seconds")))
+
+    for name, current, previous in pairs:
+        if current is not None and previous and current > previous * (1 + threshold):
+            print(f"🐢 {name}: {previous:.2f}s → {current:.2f}s (+{(current / previous - 1) * 100:.0f}%)")
+            regressions.append(name)
+    if not regressions:
+        print("✅ No regressions against the baseline")
+    print_token_change(report, baseline)
+    return regressions
+
+def print_token_change(report, baseline):
+    """Prompt tokens per step against the baseline, e.g. a run without --prompt-budget"""
+
+    for name, flow in report["flows"].items():
+        current = flow.get("prompt_tokens_per_step")
+        previous = baseline.get("flows", {}).get(name, {}).get("prompt_tokens_per_step")
+        if current is not None and previous:
+            print(f"🪙 {name}: {previous} → {current} prompt tokens/step ({(current / previous - 1) * 100:+.0f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Suno flows offline against a local mock page")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument("--generation-seconds", type=float, default=2.0)
+    parser.add_argument("--record-seconds", type=int, default=3)
+    parser.add_argument("--prompt-budget", action="store_true", help="compact prompts and bounded agent context")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare against a report saved with --json; exit 1 on regressions")
+    parser.add_argument("--tabs", type=int, help="instead, compare N generations in sequential browsers vs tabs")
+    parser.add_argument("--tab-concurrency", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.tabs:
+        report = asyncio.run(run_tab_comparison(
+            args.tabs, args.tab_concurrency, args.llm_latency, args.generation_seconds
+        ))
+        print_tab_comparison(report)
+        if args.json:
+            Path(args.json).write_text(json.dumps(report, indent=2))
+        return
+
+    report = asyncio.run(run_benchmark(
+        args.runs, args.llm_latency, args.generation_seconds, args.record_seconds, budget=args.prompt_budget
+    ))
+    print_benchmark(report)
+    print_llm_stats()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"💾 Report saved to {args.json}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if compare_to_baseline(report, baseline):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
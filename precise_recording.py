@@ -0,0 +1,116 @@
+# precise_recording.py
+import asyncio
+import json
+import time
+from pathlib import Path
+from browser_use import Agent
+from llm_client import get_llm
+from selector_cache import element_memory_controller
+from tracing import run_traced
+from prompt_budget import budget_agent_kwargs
+
+TAKES_LOG = Path.home() / ".suno_recording_takes.jsonl"
+
+async def locate_recording_controls(browser_session, selector_cache=None):
+    """Find the record and stop buttons once, from the selector cache or via the agent"""
+
+    page = await browser_session.get_current_page()
+    url = page.url
+
+    if selector_cache is not None:
+        record = selector_cache.get(url, "red_record_button")
+        if record and await page.locator(record).count():
+            selector_cache.stats["hits"] += 1
+            selector_cache.save()
+            controls = {"record": record}
+            stop = selector_cache.get(url, "stop_button")
+            if stop:
+                controls["stop"] = stop
+            return controls
+        if record:
+            selector_cache.invalidate(url, "red_record_button")
+        selector_cache.stats["misses"] += 1
+
+    found = {}
+    agent = Agent(
+        task="""
+        Find the recording controls in Suno, but do NOT click anything:
+
+        1. I should see the recording interface with the red record button
+        2. Use remember_element with intent "red_record_button" for the red record button
+        3. If a separate stop button is visible, remember it with intent "stop_button"
+        4. If record and stop are the same toggle button, only remember "red_record_button"
+        5. Report done once the controls are remembered
+        """,
+        llm=get_llm(temperature=0.1),
+        browser_session=browser_session,
+        controller=element_memory_controller(found),
+        **budget_agent_kwargs()
+    )
+    await run_traced(agent, max_steps=5)
+
+    if "red_record_button" not in found:
+        raise RuntimeError("Agent could not locate the record button")
+
+    if selector_cache is not None:
+        for intent, selector in found.items():
+            selector_cache.put(url, intent, selector)
+
+    controls = {"record": found["red_record_button"]}
+    if "stop_button" in found:
+        controls["stop"] = found["stop_button"]
+    return controls
+
+async def _click_at(locator, deadline):
+    """Click locator as close to the loop-time deadline as possible, returns skew in ms"""
+
+    loop = asyncio.get_running_loop()
+    delay = deadline - loop.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    await locator.click(no_wait_after=True)
+    return (loop.time() - deadline) * 1000
+
+async def timed_recording(browser_session, controls, duration_seconds, lead_in=1.0):
+    """Start and stop a recording with scheduled browser clicks instead of LLM waits"""
+
+    page = await browser_session.get_current_page()
+    record = page.locator(controls["record"])
+    # Toggle-style UIs reuse the record button as stop
+    stop = page.locator(controls.get("stop") or controls["record"])
+
+    # Resolve and run actionability checks up front so they don't count as skew
+    await record.click(trial=True)
+
+    loop = asyncio.get_running_loop()
+    start_at = loop.time() + lead_in
+    start_skew = await _click_at(record, start_at)
+    print("🔴 RECORDING STARTED - PLAY YOUR GUITAR NOW!")
+
+    if "stop" in controls:
+        await stop.wait_for(state="visible", timeout=duration_seconds * 1000)
+
+    stop_at = start_at + duration_seconds
+    stop_skew = await _click_at(stop, stop_at)
+    print("⏹️ RECORDING STOPPED")
+
+    take = {
+        "time": time.time(),
+        "url": page.url,
+        "duration_seconds": duration_seconds,
+        "recorded_seconds": round(duration_seconds + (stop_skew - start_skew) / 1000, 3),
+        "start_skew_ms": round(start_skew, 1),
+        "stop_skew_ms": round(stop_skew, 1)
+    }
+    log_take(take)
+    print(f"⏱️  Start skew {take['start_skew_ms']}ms, stop skew {take['stop_skew_ms']}ms, "
+          f"recorded {take['recorded_seconds']}s")
+
+    return take
+
+def log_take(take, log_path=TAKES_LOG):
+    """Append a take's timing to the JSONL takes log"""
+
+    with open(log_path, "a") as f:
+        f.write(json.dumps(take) + "\n")
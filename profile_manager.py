@@ -0,0 +1,182 @@
+# profile_manager.py
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+TEMPLATE_DIR = Path.home() / ".suno_profile_template"
+CLONES_DIR = Path.home() / ".suno_profile_clones"
+
+# Present while a clone is in use, holding the owner's pid; gc_clones() skips it
+IN_USE_MARKER = ".suno_in_use"
+
+# Chromium rewrites these with write-to-temp + rename, so a hardlinked copy
+# gets replaced instead of modified in place and the template stays intact.
+# Everything else (SQLite databases, caches) is copied.
+ATOMICALLY_REPLACED_FILES = {"Preferences", "Secure Preferences", "Local State", "First Run"}
+
+PROFILE_PREFERENCES = {
+    "profile": {
+    },
+    "webkit": {
+        "webprefs": {
+            "default_encoding": "UTF-8"
+        }
+    },
+    "browser": {
+        "has_seen_welcome_page": True,
+        "check_default_browser": False
+    },
+    "distribution": {
+        "skip_first_run_ui": True,
+        "suppress_first_run_default_browser_prompt": True
+    }
+}
+
+def build_template(template_dir=TEMPLATE_DIR, force=False, warm=False):
+    """Build the golden profile once: Preferences plus a first-run-complete state
+
+    With warm, Chromium is launched headless on the template once so its
+    first-run initialisation is baked in and never repeated by clones.
+    """
+
+    template_dir = Path(template_dir)
+    marker = template_dir / "First Run"
+
+    if marker.exists() and not force:
+        return str(template_dir)
+
+    if template_dir.exists():
+        shutil.rmtree(template_dir)
+
+    prefs_dir = template_dir / "Default"
+    prefs_dir.mkdir(parents=True)
+
+    with open(prefs_dir / "Preferences", 'w') as f:
+        json.dump(PROFILE_PREFERENCES, f, indent=2)
+    with open(template_dir / "Local State", 'w') as f:
+        json.dump({"browser": {"has_seen_welcome_page": True}}, f, indent=2)
+
+    if warm:
+        _warm_template(template_dir)
+
+    # Written last so a half-built template is rebuilt next time
+    marker.touch()
+    print(f"✅ Built profile template: {template_dir}")
+    return str(template_dir)
+
+def _warm_template(template_dir):
+    import asyncio
+    from browser_use import BrowserProfile, BrowserSession
+
+    async def launch_once():
+        browser_session = BrowserSession(
+            browser_profile=BrowserProfile(user_data_dir=str(template_dir), headless=True)
+        )
+        await browser_session.start()
+        await browser_session.kill()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(launch_once())
+        return
+
+    # Called from async code: asyncio.run() can't nest, so launch on a thread with its own loop
+    thread = threading.Thread(target=asyncio.run, args=(launch_once(),))
+    thread.start()
+    thread.join()
+
+def _reflink_copy(src, dst):
+    """Copy-on-write clone of a whole directory, returns False when unsupported"""
+
+    if sys.platform == "darwin":
+        command = ["cp", "-c", "-R", str(src), str(dst)]
+    elif sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=always", str(src), str(dst)]
+    else:
+        return False
+
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        shutil.rmtree(dst, ignore_errors=True)
+        return False
+    return True
+
+def _link_or_copy(src, dst):
+    if Path(src).name in ATOMICALLY_REPLACED_FILES:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+def clone_profile(template_dir=TEMPLATE_DIR, clones_dir=CLONES_DIR):
+    """Clone the template into a fresh per-run profile directory
+
+    The clone is marked in use by this process until release_clone().
+    """
+
+    template_dir = Path(build_template(template_dir))
+    clones_dir = Path(clones_dir)
+    clones_dir.mkdir(parents=True, exist_ok=True)
+
+    clone = clones_dir / f"run-{int(time.time())}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    if not _reflink_copy(template_dir, clone):
+        shutil.copytree(template_dir, clone, copy_function=_link_or_copy)
+
+    # Both copies keep the template's mtime, which would make a new clone look old to gc_clones()
+    os.utime(clone)
+    (clone / IN_USE_MARKER).write_text(str(os.getpid()))
+    return str(clone)
+
+def release_clone(clone):
+    """Mark a clone as no longer in use so gc_clones() may remove it"""
+
+    try:
+        (Path(clone) / IN_USE_MARKER).unlink()
+    except FileNotFoundError:
+        pass
+
+def _in_use(clone):
+    """True while the process that created the clone is alive and hasn't released it"""
+
+    import psutil
+
+    try:
+        pid = int((clone / IN_USE_MARKER).read_text())
+    except (FileNotFoundError, ValueError):
+        return False
+    return psutil.pid_exists(pid)
+
+def gc_clones(max_age_seconds=3600, clones_dir=CLONES_DIR):
+    """Delete clones older than max_age_seconds that are not in use, returns how many were removed"""
+
+    clones_dir = Path(clones_dir)
+    if not clones_dir.exists():
+        return 0
+
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for clone in clones_dir.iterdir():
+        try:
+            if clone.is_dir() and clone.stat().st_mtime < cutoff and not _in_use(clone):
+                shutil.rmtree(clone, ignore_errors=True)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+def start_background_gc(max_age_seconds=3600, clones_dir=CLONES_DIR):
+    """Garbage-collect old clones on a daemon thread"""
+
+    thread = threading.Thread(target=gc_clones, args=(max_age_seconds, clones_dir), daemon=True)
+    thread.start()
+    return thread
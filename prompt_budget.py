@@ -0,0 +1,98 @@
+# prompt_budget.py
+import os
+import re
+import textwrap
+import tracing
+
+# Off by default; SUNO_PROMPT_BUDGET=1 (or enable()) turns on compact prompts and bounded context
+PROMPT_BUDGET = os.getenv("SUNO_PROMPT_BUDGET", "").lower() in ("1", "true", "yes")
+
+# Agent settings applied in budget mode
+BUDGET = {
+    # Most recent history items kept verbatim (browser_use needs more than 5)
+    "max_history_items": int(os.getenv("SUNO_PROMPT_HISTORY", "8")),
+    # Screenshots are the largest payload; only send them when asked for
+    "use_vision": os.getenv("SUNO_PROMPT_VISION", "").lower() in ("1", "true", "yes"),
+    "images_per_step": 1,
+    "max_actions_per_step": 4,
+    # Attributes serialized per element; the defaults add values, dates and data-state
+    "include_attributes": ["title", "type", "checked", "name", "role", "placeholder", "aria-label", "aria-checked"]
+}
+
+# Pixels beyond the viewport whose elements are serialized (browser_use default 500)
+BUDGET_VIEWPORT_EXPANSION = int(os.getenv("SUNO_PROMPT_VIEWPORT_EXPANSION", "0"))
+
+# Compact versions of the long flow tasks, keyed by flow
+COMPACT_TASKS = {
+    "setup_recording": (
+        'Set up guitar recording: on suno.com/create (logged in) click "Record" (middle option, not Upload). '
+        "Don't start recording. Done when the red record button and timer are visible."
+    ),
+    "record_session": (
+        'Record a guitar session: click the red record button, say "RECORDING STARTED - PLAY YOUR GUITAR NOW!". '
+        'Wait for exactly {duration_seconds} seconds, click stop, say "RECORDING STOPPED", '
+        'then click any "next" or "continue" button to proceed.'
+    ),
+    "extension": (
+        'Set up the AI extension: enable "Instrumental"; in the song description field enter: '
+        '"Extend this guitar recording: {extension_prompt}"; click generate/create. Done when generation starts.'
+    ),
+    "drag_drop": (
+        'On suno.com/create look for drag & drop upload areas ("Drop files here", dashed borders). '
+        "Report which upload options you can see."
+    ),
+    "upload_continuation": (
+        'Continue after file upload: select "Instrumental"; in the prompt field enter: '
+        '"Extend this guitar recording: add drums and bass"; click generate/create. Done when generation starts.'
+    ),
+    "extend_clip": (
+        "Go to {url}, open the clip's options menu, choose \"Extend\", select \"Instrumental\"; in the prompt field "
+        'enter: "Extend this guitar recording: {extension_prompt}"; click generate/create. Done when generation starts.'
+    ),
+    "mic_test": (
+        "On https://suno.com/create open the recording/microphone option. "
+        "Report whether recording audio works and whether the microphone shows as allowed."
+    ),
+    "fresh_profile_test": (
+        'On https://suno.com/create click "Audio" or "Record", accept any permission prompts, '
+        "record 2-3 seconds, then stop. Report the exact behavior and any errors."
+    ),
+    "debug_permissions": (
+        "Debug microphone permissions: check suno.com in chrome://settings/content/microphone; "
+        "on https://suno.com/create run navigator.mediaDevices.getUserMedia({{audio: true}}) in the console; "
+        "check the site's microphone permission via the address bar; try recording. "
+        "Report the permission status at each step. Preflight result: {preflight}"
+    )
+}
+
+def enable(on=True):
+    """Switch budget mode for this process (the env var sets the default)"""
+
+    global PROMPT_BUDGET
+    PROMPT_BUDGET = on
+    tracing.SPAN_TAGS["prompt_budget"] = on
+
+tracing.SPAN_TAGS["prompt_budget"] = PROMPT_BUDGET
+
+def compile_task(task):
+    """Collapse an indented multi-line task to one line per instruction"""
+
+    lines = [line.strip() for line in textwrap.dedent(task).splitlines()]
+    return "\n".join(re.sub(r"\s+", " ", line) for line in lines if line)
+
+def task_prompt(name, verbose, **values):
+    """The compact task for name in budget mode, else the verbose one (whitespace-compiled either way)"""
+
+    if PROMPT_BUDGET and name in COMPACT_TASKS:
+        return COMPACT_TASKS[name].format(**values)
+    return compile_task(verbose) if PROMPT_BUDGET else verbose
+
+def budget_agent_kwargs():
+    """Extra Agent arguments that bound history, DOM and screenshot payloads in budget mode"""
+
+    return dict(BUDGET) if PROMPT_BUDGET else {}
+
+def budget_profile_kwargs():
+    """Extra BrowserProfile arguments for budget mode"""
+
+    return {"viewport_expansion": BUDGET_VIEWPORT_EXPANSION} if PROMPT_BUDGET else {}
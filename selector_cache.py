@@ -0,0 +1,214 @@
+# selector_cache.py
+import json
+import os
+from pathlib import Path
+from urllib.parse import urlparse
+from browser_use import ActionResult, Agent, BrowserSession, Controller
+from llm_client import get_llm
+from tracing import run_traced
+from prompt_budget import budget_agent_kwargs
+
+SELECTOR_CACHE_PATH = Path.home() / ".suno_selector_cache.json"
+
+# Intents used by the Suno flows, with the description the fallback agent gets
+SUNO_INTENTS = {
+    "record_mode_button": 'the "Record" option (the middle one between "Upload" and "song")',
+    "red_record_button": "the red record button in the recording interface",
+    "stop_button": "the stop button that ends a running recording",
+    "instrumental_toggle": 'the "Instrumental" checkbox or toggle',
+    "prompt_field": "the song description / prompt text field",
+    "generate_button": "the generate / create button",
+    "next_button": 'any "next" or "continue" button shown after recording (if there is none, just report done)'
+}
+
+class SelectorCache:
+    """Persistent cache of element selectors that worked, keyed by page and intent"""
+
+    def __init__(self, path=SELECTOR_CACHE_PATH):
+        self.path = Path(path)
+        self.selectors = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                self.selectors = data.get("selectors", {})
+                self.stats.update(data.get("stats", {}))
+            except (json.JSONDecodeError, OSError):
+                print(f"⚠️ Ignoring unreadable selector cache: {self.path}")
+
+    @staticmethod
+    def key(url, intent):
+        parsed = urlparse(url)
+        return f"{parsed.netloc}{parsed.path.rstrip('/')}::{intent}"
+
+    def get(self, url, intent):
+        return self.selectors.get(self.key(url, intent))
+
+    def put(self, url, intent, selector):
+        self.selectors[self.key(url, intent)] = selector
+        self.save()
+
+    def invalidate(self, url, intent):
+        if self.selectors.pop(self.key(url, intent), None) is not None:
+            self.stats["invalidations"] += 1
+            self.save()
+
+    def save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"selectors": self.selectors, "stats": self.stats}, indent=2))
+        os.replace(tmp_path, self.path)
+
+    def print_stats(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups * 100 if lookups else 0
+        print(
+            f"🗂️  Selector cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+            f"{self.stats['invalidations']} invalidations ({hit_rate:.0f}% hit rate, "
+            f"~{self.stats['hits']} agent runs saved)"
+        )
+
+def element_memory_controller(found):
+    """Controller with an action that stores selectors for elements the agent picks"""
+
+    controller = Controller()
+
+    @controller.action(
+        "Remember the element used for an intent. intent is the name you were given, index is the element index."
+    )
+    async def remember_element(intent: str, index: int, browser_session: BrowserSession):
+        selector_map = await browser_session.get_selector_map()
+        node = selector_map.get(index)
+        if node is None:
+            return ActionResult(error=f"No element with index {index}")
+
+        found[intent] = f"xpath={node.xpath}"
+        return ActionResult(
+            extracted_content=f"Remembered {intent}: <{node.tag_name}> at index {index}",
+            include_in_memory=True
+        )
+
+    return controller
+
+CHECKED_STATE_SCRIPT = "el => el.getAttribute('aria-checked') || el.getAttribute('aria-pressed') || String(!!el.checked)"
+
+async def _perform(locator, action, value=None):
+    """Act on the element and confirm the result, raising when the page didn't take it"""
+
+    if action == "fill":
+        await locator.fill(value)
+        if await locator.input_value() != value:
+            raise RuntimeError("field did not keep the typed value")
+    elif action == "check":
+        if await locator.evaluate(CHECKED_STATE_SCRIPT) != "true":
+            await locator.click()
+            if await locator.evaluate(CHECKED_STATE_SCRIPT) != "true":
+                raise RuntimeError("toggle did not switch on")
+    else:
+        await locator.click()
+
+def _agent_instruction(intent, action, value=None):
+    target = SUNO_INTENTS.get(intent, intent.replace("_", " "))
+    if action == "fill":
+        return f'Type "{value}" into {target}'
+    if action == "check":
+        return f"Make sure {target} is checked/enabled"
+    return f"Click {target}"
+
+async def cached_action(browser_session, cache, intent, action="click", value=None, timeout_ms=2000):
+    """Act on an element via its cached selector, falling back to the agent on a miss
+
+    A cached selector that no longer resolves (stale DOM) is invalidated and
+    the agent is asked to do the step and remember the element it used.
+    """
+
+    page = await browser_session.get_current_page()
+    selector = cache.get(page.url, intent)
+
+    if selector:
+        locator = page.locator(selector).first
+        try:
+            await locator.wait_for(state="visible", timeout=timeout_ms)
+            await _perform(locator, action, value)
+            cache.stats["hits"] += 1
+            cache.save()
+            return True
+        except Exception as e:
+            print(f"♻️ Cached selector for {intent} is stale ({type(e).__name__}), asking the agent")
+            cache.invalidate(page.url, intent)
+
+    cache.stats["misses"] += 1
+    url = page.url
+    found = {}
+    agent = Agent(
+        task=f"""
+        {_agent_instruction(intent, action, value)}.
+        Before acting on it, call remember_element with intent "{intent}" and the element's index.
+        Do nothing else, then report done.
+        """,
+        llm=get_llm(temperature=0.1),
+        browser_session=browser_session,
+        controller=element_memory_controller(found),
+        **budget_agent_kwargs()
+    )
+    result = await run_traced(agent, max_steps=5)
+
+    if intent in found:
+        cache.put(url, intent, found[intent])
+    else:
+        cache.save()
+    # Hitting max_steps without done leaves is_successful() None, which is not a success
+    return result.is_done() and result.is_successful() is not False
+
+async def resolve_intents(browser_session, cache, intents):
+    """Find elements ahead of time without acting on them; returns the intents still unresolved
+
+    Cached selectors that still match a visible element are kept; the rest
+    are looked up by one agent that only remembers elements, so a later
+    cached_action() hits. Also used to check that a page state was reached.
+    """
+
+    page = await browser_session.get_current_page()
+    url = page.url
+    missing = []
+    for intent in intents:
+        selector = cache.get(url, intent)
+        if selector and await page.locator(selector).first.is_visible():
+            continue
+        if selector:
+            cache.invalidate(url, intent)
+        missing.append(intent)
+
+    if not missing:
+        return []
+
+    found = {}
+    elements = "\n".join(
+        f'- {SUNO_INTENTS.get(intent, intent.replace("_", " "))}: remember_element with intent "{intent}"'
+        for intent in missing
+    )
+    agent = Agent(
+        task=f"""
+        Find these elements, but do NOT click or type anything:
+        {elements}
+        Skip any element that is not on the page, then report done.
+        """,
+        llm=get_llm(temperature=0.1),
+        browser_session=browser_session,
+        controller=element_memory_controller(found),
+        **budget_agent_kwargs()
+    )
+    await run_traced(agent, max_steps=5)
+
+    for intent, selector in found.items():
+        cache.put(url, intent, selector)
+    return [intent for intent in missing if intent not in found]
+
+async def run_cached_steps(browser_session, cache, steps):
+    """Run (intent, action, value) steps through the cache, stopping at the first failure"""
+
+    for intent, action, value in steps:
+        if not await cached_action(browser_session, cache, intent, action, value):
+            print(f"❌ Step failed: {intent}")
+            return False
+    return True
@@ -1,63 +1,58 @@
 # fix_permission_override.py
 import asyncio
 import os
-import json
 from pathlib import Path
 from dotenv import load_dotenv
-from browser_use import Agent
-from browser_use.llm import ChatOpenAI
+from profile_manager import clone_profile, gc_clones, release_clone, start_background_gc
+from diagnostics_runner import run_diagnostics, print_diagnostics_report, save_diagnostics_report
+from fake_audio import fake_audio_browser_args, fake_audio_clip_from_env
+from tracing import traced, run_traced
 
 load_dotenv()
 
 def create_fresh_browser_profile():
-    """Create a completely fresh browser profile with microphone permissions"""
-    
-    # Use a completely new profile directory
-    fresh_profile = Path.home() / ".suno_fresh_profile"
-    
-    if fresh_profile.exists():
-        import shutil
-        shutil.rmtree(fresh_profile)
-        print(f"🗑️ Removed old profile: {fresh_profile}")
+    """Create a completely fresh browser profile with microphone permissions
+
+    The profile is cloned from a pre-built template instead of being
+    rebuilt from scratch, so Chromium's first-run setup is not repeated.
+    """
     
-    fresh_profile.mkdir()
+    start_background_gc()
+    fresh_profile = clone_profile()
     print(f"✅ Created fresh profile: {fresh_profile}")
     
-    # Create preferences file with microphone allowed
-    prefs_dir = fresh_profile / "Default"
-    prefs_dir.mkdir()
-    
-    # Enhanced preferences with comprehensive media permissions
-    preferences = {
-        "profile": {
-        },
-        "webkit": {
-            "webprefs": {
-                "default_encoding": "UTF-8"
-            }
-        }
-    }
-    
-    prefs_file = prefs_dir / "Preferences"
-    with open(prefs_file, 'w') as f:
-        json.dump(preferences, f, indent=2)
-    
-    print("✅ Created preferences with microphone allowed")
-    return str(fresh_profile)
+    return fresh_profile
 
 def get_working_browser_args():
-    """Get browser arguments that actually work for microphone access"""
+    """Get browser arguments that actually work for microphone access
+
+    With SUNO_FAKE_AUDIO set, the microphone is replaced by an audio clip so
+    recording works headless without audio hardware.
+    """
+    fake_clip = fake_audio_clip_from_env()
+    if fake_clip:
+        return fake_audio_browser_args(fake_clip)
+    
     return [
     
     ]
 
+def use_headless():
+    """Run headless when recordings are fed from a fake audio clip"""
+    return fake_audio_clip_from_env() is not None
+
+@traced("test_with_fresh_profile")
 async def test_with_fresh_profile():
     """Test with completely fresh profile and proper flags"""
     
+    from browser_use import Agent, BrowserProfile
+    from llm_client import get_llm
+    from prompt_budget import task_prompt, budget_agent_kwargs, budget_profile_kwargs
+    
     fresh_profile = create_fresh_browser_profile()
     
     agent = Agent(
-        task="""
+        task=task_prompt("fresh_profile_test", """
         Test microphone with fresh profile and proper browser flags:
         
         1. Go to https://suno.com/create
@@ -70,25 +65,27 @@ async def test_with_fresh_profile():
         8. Report the exact behavior and any errors you see
         
         The browser should now automatically allow microphone access.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY")
+        """),
+        llm=get_llm(temperature=0.1),
+        browser_profile=BrowserProfile(
+            user_data_dir=fresh_profile,
+            headless=use_headless(),
+            args=get_working_browser_args(),
+            **budget_profile_kwargs()
         ),
-        browser_session_config={
-            "user_data_dir": fresh_profile,
-            "headless": False,
-            "browser_args": get_working_browser_args()
-        }
+        **budget_agent_kwargs()
     )
     
     print("🆕 Testing with fresh browser profile and working flags...")
-    result = await agent.run()
+    try:
+        result = await run_traced(agent)
+    finally:
+        release_clone(fresh_profile)
     print("✅ Fresh profile test result:", result)
     
     return result
 
+@traced("test_without_browser_use")
 async def test_without_browser_use():
     """Test by manually launching browser without Browser Use interference"""
     
@@ -133,13 +130,18 @@ async def test_without_browser_use():
     print()
     print("💡 This will show if Browser Use is causing the permission issues")
 
+@traced("test_minimal_browser_use")
 async def test_minimal_browser_use():
     """Test with Browser Use but minimal interference"""
     
+    from browser_use import Agent, BrowserProfile
+    from llm_client import get_llm
+    from prompt_budget import task_prompt, budget_agent_kwargs, budget_profile_kwargs
+    
     fresh_profile = create_fresh_browser_profile()
     
     agent = Agent(
-        task="""
+        task=task_prompt("mic_test", """
         Simple test with working browser flags:
         
         1. Go to https://suno.com/create
@@ -149,68 +151,99 @@ async def test_minimal_browser_use():
         5. Test if the microphone icon shows as allowed (not blocked)
         
         Just focus on whether microphone access works.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY")
+        """),
+        llm=get_llm(temperature=0.1),
+        browser_profile=BrowserProfile(
+            user_data_dir=fresh_profile,
+            headless=use_headless(),
+            args=get_working_browser_args(),
+            **budget_profile_kwargs()
         ),
-        browser_session_config={
-            "user_data_dir": fresh_profile,
-            "headless": False,
-            "browser_args": get_working_browser_args()
-        }
+        **budget_agent_kwargs()
     )
     
     print("🔬 Testing with Browser Use + working flags...")
-    result = await agent.run()
+    try:
+        result = await run_traced(agent)
+    finally:
+        release_clone(fresh_profile)
     print("✅ Minimal test result:", result)
     
     return result
 
-async def debug_permissions():
-    """Debug what's happening with permissions in detail"""
+@traced("debug_permissions")
+async def debug_permissions(force_agent=False):
+    """Debug what's happening with permissions in detail
+
+    A fast DevTools preflight runs first, in the same browser the agent
+    would use; the agent-driven diagnosis only runs when the preflight
+    fails (or force_agent is set).
+    """
+    
+    from browser_use import Agent, BrowserProfile, BrowserSession
+    from llm_client import get_llm
+    from prompt_budget import task_prompt, budget_agent_kwargs, budget_profile_kwargs
+    from mic_preflight import microphone_preflight, print_preflight
     
     fresh_profile = create_fresh_browser_profile()
+    browser_session = BrowserSession(
+        browser_profile=BrowserProfile(
+            user_data_dir=fresh_profile,
+            headless=use_headless(),
+            args=get_working_browser_args(),
+            keep_alive=True,
+            **budget_profile_kwargs()
+        )
+    )
     
-    agent = Agent(
-        task="""
-        Debug microphone permissions step by step:
+    try:
+        print("⚡ Running microphone preflight...")
+        preflight = await microphone_preflight(browser_session=browser_session)
+        print_preflight(preflight)
         
-        1. Go to chrome://settings/content/microphone
-        2. Check if suno.com is listed and what its permission status is
-        3. Go to https://suno.com/create
-        4. Open Developer Tools (F12) 
-        5. In the console, run this JavaScript:
-           navigator.mediaDevices.getUserMedia({audio: true})
-           .then(() => console.log('✅ Microphone access granted'))
-           .catch(err => console.log('❌ Microphone error:', err))
-        6. Click the lock/info icon in the address bar
-        7. Check the site permissions for microphone
-        8. Try to use the actual recording feature on Suno
-        9. Report all findings in detail
+        if preflight["ok"] and not force_agent:
+            print("✅ Microphone works, skipping the detailed agent diagnosis")
+            return preflight
         
-        Give me the exact status of microphone permissions at each step.
-        """,
-        llm=ChatOpenAI(
-            model="gpt-4o-mini", 
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY")
-        ),
-        browser_session_config={
-            "user_data_dir": fresh_profile,
-            "headless": False,
-            "browser_args": get_working_browser_args()
-        }
-    )
-    
-    print("🔍 Running detailed permission diagnosis...")
-    result = await agent.run()
-    print("✅ Debug results:", result)
-    return result
+        agent = Agent(
+            task=task_prompt("debug_permissions", """
+            Debug microphone permissions step by step:
+            
+            1. Go to chrome://settings/content/microphone
+            2. Check if suno.com is listed and what its permission status is
+            3. Go to https://suno.com/create
+            4. Open Developer Tools (F12) 
+            5. In the console, run this JavaScript:
+               navigator.mediaDevices.getUserMedia({audio: true})
+               .then(() => console.log('✅ Microphone access granted'))
+               .catch(err => console.log('❌ Microphone error:', err))
+            6. Click the lock/info icon in the address bar
+            7. Check the site permissions for microphone
+            8. Try to use the actual recording feature on Suno
+            9. Report all findings in detail
+            
+            Give me the exact status of microphone permissions at each step.
+            """ + f"""
+            For reference, a direct getUserMedia preflight returned: {preflight}
+            """, preflight=preflight),
+            llm=get_llm(temperature=0.1),
+            browser_session=browser_session,
+            **budget_agent_kwargs()
+        )
+        
+        print("🔍 Running detailed permission diagnosis...")
+        result = await run_traced(agent)
+        print("✅ Debug results:", result)
+        return result
+    finally:
+        await browser_session.kill()
+        release_clone(fresh_profile)
 
 def reset_all_profiles():
-    """Reset all browser profiles we've created"""
+    """Reset all browser profiles we've created
+
+    The profile template is kept so the next fresh profile is still a fast clone.
+    """
     
     profiles = [
         Path.home() / ".suno_browser_profile",
@@ -223,40 +256,38 @@ def reset_all_profiles():
             shutil.rmtree(profile)
             print(f"🗑️ Deleted: {profile}")
     
+    removed = gc_clones(max_age_seconds=0)
+    if removed:
+        print(f"🗑️ Deleted {removed} fresh profile clone(s)")
+    
     print("✅ All profiles reset")
 
-async def test_comprehensive():
-    """Run all tests to find what works"""
+async def test_comprehensive(concurrency=3, report_path=None):
+    """Run all tests to find what works
+
+    The browser diagnostics run concurrently (up to `concurrency` at once),
+    each on its own cloned profile, and are merged into one report.
+    """
+    
+    from llm_client import print_llm_stats
     
     print("🔬 Running comprehensive test suite...")
     print("=" * 50)
     
     # Reset everything first
     reset_all_profiles()
-    await asyncio.sleep(1)
     
-    print("\n1️⃣ Testing minimal Browser Use with working flags...")
-    try:
-        result1 = await test_minimal_browser_use()
-        print(f"Result 1: {result1}")
-    except Exception as e:
-        print(f"Test 1 failed: {e}")
+    print(f"\n🚀 Running diagnostics concurrently (limit {concurrency})...")
+    report = await run_diagnostics([
+        ("Minimal Browser Use with working flags", test_minimal_browser_use),
+        ("Fresh profile with enhanced permissions", test_with_fresh_profile),
+        ("Permission diagnostics", debug_permissions)
+    ], concurrency=concurrency)
     
-    print("\n" + "="*50)
-    print("\n2️⃣ Testing fresh profile with enhanced permissions...")
-    try:
-        result2 = await test_with_fresh_profile()  
-        print(f"Result 2: {result2}")
-    except Exception as e:
-        print(f"Test 2 failed: {e}")
-    
-    print("\n" + "="*50)
-    print("\n3️⃣ Running permission diagnostics...")
-    try:
-        result3 = await debug_permissions()
-        print(f"Result 3: {result3}")
-    except Exception as e:
-        print(f"Test 3 failed: {e}")
+    print_diagnostics_report(report)
+    print_llm_stats()
+    if report_path:
+        save_diagnostics_report(report, report_path)
     
     print("\n" + "="*50)
     print("\n4️⃣ Manual browser instructions...")
@@ -266,6 +297,8 @@ async def test_comprehensive():
     print("- The --use-fake-ui-for-media-stream flag should fix the issue")
     print("- If Browser Use still blocks it, try the manual browser approach")
     print("- Check the debug results for specific error messages")
+    
+    return report
 
 async def main():
     if not os.getenv("OPENAI_API_KEY"):
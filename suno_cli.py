@@ -0,0 +1,324 @@
+# suno_cli.py
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Project modules listed by the import-time report
+PROJECT_MODULES = [
+    "suno_cli", "tracing", "profile_manager", "fake_audio", "upload_cache", "wav_synth", "corpus_gen", "audio_prep",
+    "clip_scoring", "multi_tab", "diagnostics_runner", "simple_record", "file_upload", "suno_session", "llm_client", "selector_cache",
+    "mic_preflight", "prompt_budget", "basic_suno_test", "batch_jobs", "offline_bench"
+]
+
+# Anything slower than this to import is flagged in the report
+HEAVY_IMPORT_MS = 100
+
+def _require_api_key():
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Please set OPENAI_API_KEY in your .env file")
+        return False
+    return True
+
+def _run_agent_command(coroutine_function, *args, **kwargs):
+    if not _require_api_key():
+        return 1
+    asyncio.run(coroutine_function(*args, **kwargs))
+    return 0
+
+def cmd_jam(args):
+    from basic_suno_test import live_guitar_jam_session
+    return _run_agent_command(
+        live_guitar_jam_session,
+        args.duration,
+        args.prompt,
+        reuse_session=not args.no_reuse,
+        precise_timing=not args.agent_timing,
+        wait_for_completion=not args.no_wait,
+        best_of=args.best_of,
+        keep_top=args.keep
+    )
+
+def cmd_manual(args):
+    from basic_suno_test import manual_control_session
+    return _run_agent_command(manual_control_session)
+
+def cmd_setup(args):
+    from basic_suno_test import start_guitar_recording
+    return _run_agent_command(start_guitar_recording, args.prompt, replay=not args.no_replay)
+
+def cmd_continue_upload(args):
+    from file_upload import manual_upload_continuation
+    return _run_agent_command(manual_upload_continuation, replay=not args.no_replay)
+
+def cmd_extend(args):
+    from upload_cache import UploadIndex
+    _, entry = UploadIndex().lookup(args.audio)
+    if entry is None:
+        print(f"❌ {args.audio} has not been uploaded yet; upload it, then run continue-upload")
+        return 1
+
+    if args.variants > 1:
+        from basic_suno_test import prompt_variants
+        from file_upload import extend_clip_in_tabs
+        return _run_agent_command(
+            extend_clip_in_tabs, entry, prompt_variants(args.prompt, args.variants),
+            concurrency=args.tabs, wait=not args.no_wait
+        )
+
+    from file_upload import extend_existing_clip
+    return _run_agent_command(extend_existing_clip, entry, args.prompt)
+
+def cmd_drag_drop(args):
+    from file_upload import try_drag_drop_upload
+    return _run_agent_command(try_drag_drop_upload)
+
+def cmd_test_file(args):
+    from file_upload import create_desktop_test_file
+    return 0 if create_desktop_test_file() else 1
+
+def cmd_mic_test(args):
+    from simple_record import test_minimal_browser_use
+    return _run_agent_command(test_minimal_browser_use)
+
+def cmd_fresh_profile_test(args):
+    from simple_record import test_with_fresh_profile
+    return _run_agent_command(test_with_fresh_profile)
+
+def cmd_manual_browser(args):
+    from simple_record import test_without_browser_use
+    asyncio.run(test_without_browser_use())
+    return 0
+
+def cmd_preflight(args):
+    from mic_preflight import microphone_preflight, print_preflight
+    from simple_record import create_fresh_browser_profile, get_working_browser_args
+
+    result = asyncio.run(microphone_preflight(
+        profile_dir=create_fresh_browser_profile(), browser_args=get_working_browser_args(), timeout=args.timeout,
+        headless=args.headless
+    ))
+    print_preflight(result)
+    return 0 if result["ok"] else 1
+
+def cmd_debug_permissions(args):
+    from simple_record import debug_permissions
+    return _run_agent_command(debug_permissions, force_agent=args.force_agent)
+
+def cmd_reset_profiles(args):
+    from simple_record import reset_all_profiles
+    reset_all_profiles()
+    return 0
+
+def cmd_comprehensive(args):
+    from simple_record import test_comprehensive
+    return _run_agent_command(test_comprehensive, concurrency=args.concurrency, report_path=args.report)
+
+def cmd_batch(args):
+    from batch_jobs import run_batch
+    return _run_agent_command(
+        run_batch, args.jobs, workers=args.workers, headless=args.headless, preprocess=not args.no_preprocess
+    )
+
+def cmd_preprocess(args):
+    from audio_prep import PREPROCESSED_DIR, preprocess_batch
+    results = preprocess_batch(
+        args.files,
+        workers=args.workers,
+        cache_dir=args.out or PREPROCESSED_DIR,
+        sample_rate=args.sample_rate,
+        max_seconds=args.max_seconds,
+        output_format=args.format
+    )
+    return 0 if len(results) == len(args.files) else 1
+
+def cmd_score(args):
+    from clip_scoring import keep_top_k, print_ranking, rank_candidates
+    ranking = rank_candidates(args.candidates, args.input, args.keep)
+    if args.keep is not None and args.rejected_dir:
+        keep_top_k(ranking, args.rejected_dir)
+    print_ranking(ranking)
+    return 0
+
+def cmd_bench(args):
+    if args.tabs:
+        from offline_bench import run_tab_comparison, print_tab_comparison
+        print_tab_comparison(asyncio.run(run_tab_comparison(args.tabs, args.tab_concurrency, args.llm_latency)))
+        return 0
+
+    from offline_bench import run_benchmark, print_benchmark
+    report = asyncio.run(run_benchmark(args.runs, args.llm_latency, budget=args.prompt_budget))
+    print_benchmark(report)
+    return 0
+
+def cmd_corpus(args):
+    from corpus_gen import DEFAULT_CORPUS_DIR, build_specs, generate_corpus
+    specs = build_specs(args.count, seed=args.seed, duration=args.duration)
+    generate_corpus(specs, args.out or DEFAULT_CORPUS_DIR, workers=args.workers)
+    return 0
+
+def cmd_trace_summary(args):
+    from tracing import TRACE_PATH, print_summary, summarize
+    path = args.file or TRACE_PATH
+    if not os.path.exists(path):
+        print(f"❌ No traces at {path}")
+        return 1
+    print_summary(summarize(path, args.by))
+    return 0
+
+def import_time_ms(module):
+    """Cumulative import time of module in a fresh interpreter, from -X importtime"""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    for line in reversed(result.stderr.splitlines()):
+        match = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)$", line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1000
+    return None
+
+def cmd_import_report(args):
+    modules = args.modules or PROJECT_MODULES
+    print(f"{'module':<22} {'import ms':>10}")
+    for module in modules:
+        ms = import_time_ms(module)
+        if ms is None:
+            print(f"{module:<22} {'failed':>10}")
+            continue
+        marker = "  🐢" if ms > HEAVY_IMPORT_MS else ""
+        print(f"{module:<22} {ms:>10.1f}{marker}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Suno guitar recording automation")
+    parser.add_argument("--timing", action="store_true", help="print how long the command took")
+    parser.add_argument("--prompt-budget", action="store_true",
+                        help="compact agent prompts and bounded history/DOM/screenshots (or SUNO_PROMPT_BUDGET=1)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    jam = commands.add_parser("jam", help="record a guitar take and extend it with AI")
+    jam.add_argument("--duration", type=int, default=30)
+    jam.add_argument("--prompt", default="add rock drums and bass")
+    jam.add_argument("--no-reuse", action="store_true", help="launch a browser per step")
+    jam.add_argument("--agent-timing", action="store_true", help="let the agent time the recording")
+    jam.add_argument("--no-wait", action="store_true", help="don't wait for the generation to finish")
+    jam.add_argument("--best-of", type=int, default=1, help="generate this many prompt variants")
+    jam.add_argument("--keep", type=int, default=1, help="keep the best K clips of a --best-of run")
+    jam.set_defaults(handler=cmd_jam)
+
+    commands.add_parser("manual", help="interactive start/stop control").set_defaults(handler=cmd_manual)
+
+    setup = commands.add_parser("setup", help="just open the recording interface")
+    setup.add_argument("--prompt", default="add drums and bass")
+    setup.add_argument("--no-replay", action="store_true")
+    setup.set_defaults(handler=cmd_setup)
+
+    continue_upload = commands.add_parser("continue-upload", help="continue after a manual file upload")
+    continue_upload.add_argument("--no-replay", action="store_true")
+    continue_upload.set_defaults(handler=cmd_continue_upload)
+
+    extend = commands.add_parser("extend", help="extend an audio file that was uploaded before")
+    extend.add_argument("audio")
+    extend.add_argument("--prompt", default="add drums and bass")
+    extend.add_argument("--variants", type=int, default=1,
+                        help="extend the clip this many ways (prompt variants), each from its own tab")
+    extend.add_argument("--tabs", type=int, default=None, help="tabs driven at once (default SUNO_TAB_CONCURRENCY)")
+    extend.add_argument("--no-wait", action="store_true", help="don't wait for the variants to finish")
+    extend.set_defaults(handler=cmd_extend)
+
+    commands.add_parser("drag-drop", help="look for drag & drop upload").set_defaults(handler=cmd_drag_drop)
+    commands.add_parser("test-file", help="create a test guitar WAV on the Desktop").set_defaults(handler=cmd_test_file)
+
+    commands.add_parser("mic-test", help="minimal Browser Use microphone test").set_defaults(handler=cmd_mic_test)
+    commands.add_parser("fresh-profile-test", help="microphone test on a fresh profile").set_defaults(
+        handler=cmd_fresh_profile_test)
+    commands.add_parser("manual-browser", help="print a command to launch Chrome without Browser Use").set_defaults(
+        handler=cmd_manual_browser)
+
+    preflight = commands.add_parser("preflight", help="check getUserMedia directly, no agent")
+    preflight.add_argument("--timeout", type=float, default=5.0)
+    preflight.add_argument("--headless", action="store_true", help="faster, but permissions may differ from headed")
+    preflight.set_defaults(handler=cmd_preflight)
+
+    debug = commands.add_parser("debug-permissions", help="preflight, then agent diagnosis if it fails")
+    debug.add_argument("--force-agent", action="store_true")
+    debug.set_defaults(handler=cmd_debug_permissions)
+
+    commands.add_parser("reset-profiles", help="delete the browser profiles").set_defaults(handler=cmd_reset_profiles)
+
+    comprehensive = commands.add_parser("comprehensive", help="run all diagnostics concurrently")
+    comprehensive.add_argument("--concurrency", type=int, default=3)
+    comprehensive.add_argument("--report", help="save the diagnostics report as JSON")
+    comprehensive.set_defaults(handler=cmd_comprehensive)
+
+    batch = commands.add_parser("batch", help="run a JSONL queue of extension jobs")
+    batch.add_argument("jobs")
+    batch.add_argument("--workers", type=int, default=2)
+    batch.add_argument("--headless", action="store_true")
+    batch.add_argument("--no-preprocess", action="store_true")
+    batch.set_defaults(handler=cmd_batch)
+
+    preprocess = commands.add_parser("preprocess", help="trim, normalize and shrink recordings before upload")
+    preprocess.add_argument("files", nargs="+")
+    preprocess.add_argument("--workers", type=int)
+    preprocess.add_argument("--sample-rate", type=int)
+    preprocess.add_argument("--max-seconds", type=float)
+    preprocess.add_argument("--format", choices=["auto", "wav", "m4a", "flac"], default="auto")
+    preprocess.add_argument("--out")
+    preprocess.set_defaults(handler=cmd_preprocess)
+
+    score = commands.add_parser("score", help="rank generated clips against the input recording")
+    score.add_argument("candidates", nargs="+")
+    score.add_argument("--input", help="the original guitar recording")
+    score.add_argument("--keep", type=int)
+    score.add_argument("--rejected-dir", help="move clips outside the top --keep here")
+    score.set_defaults(handler=cmd_score)
+
+    bench = commands.add_parser("bench", help="offline benchmark against the mock Suno page")
+    bench.add_argument("--runs", type=int, default=3)
+    bench.add_argument("--llm-latency", type=float, default=0.0)
+    bench.add_argument("--tabs", type=int, help="compare N generations in sequential browsers vs concurrent tabs")
+    bench.add_argument("--tab-concurrency", type=int, default=3)
+    bench.set_defaults(handler=cmd_bench)
+
+    corpus = commands.add_parser("corpus", help="generate a synthetic guitar WAV corpus")
+    corpus.add_argument("--count", type=int, default=100)
+    corpus.add_argument("--duration", type=float, default=8)
+    corpus.add_argument("--seed", type=int, default=0)
+    corpus.add_argument("--workers", type=int)
+    corpus.add_argument("--out")
+    corpus.set_defaults(handler=cmd_corpus)
+
+    traces = commands.add_parser("trace-summary", help="p50/p95 per flow from the trace log")
+    traces.add_argument("--file")
+    traces.add_argument("--by", help="split each flow by this span tag, e.g. prompt_budget")
+    traces.set_defaults(handler=cmd_trace_summary)
+
+    imports = commands.add_parser("import-report", help="import time of each module")
+    imports.add_argument("modules", nargs="*")
+    imports.set_defaults(handler=cmd_import_report)
+
+    return parser
+
+def main(argv=None):
+    started = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    if args.prompt_budget:
+        from prompt_budget import enable
+        enable()
+    try:
+        return args.handler(args)
+    finally:
+        if args.timing:
+            print(f"⏱️  {args.command} took {(time.perf_counter() - started) * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# suno_session.py
+import time
+from pathlib import Path
+from browser_use import BrowserProfile, BrowserSession
+from tracing import record_phase
+from prompt_budget import budget_profile_kwargs
+
+SUNO_CREATE_URL = "https://suno.com/create"
+DEFAULT_PROFILE_DIR = str(Path.home() / ".suno_browser_profile")
+
+# Steps that launch their own Agent browser when the session is not reused;
+# waiting, downloading and best-of-N (shared sessions only) never do
+BROWSER_STEPS = {"Setup", "Record", "Generate"}
+
+def agent_browser_kwargs(profile_dir=DEFAULT_PROFILE_DIR, browser_session=None, headless=False):
+    """Browser arguments for an Agent: reuse a live session or launch a new browser"""
+
+    if browser_session is not None:
+        return {"browser_session": browser_session}
+
+    # Agent ignores browser_session_config (it ends up in **kwargs), so pass a real profile
+    return {
+        "browser_profile": BrowserProfile(
+            user_data_dir=profile_dir,
+            headless=headless,
+            **budget_profile_kwargs()
+        )
+    }
+
+async def open_suno_session(profile_dir=DEFAULT_PROFILE_DIR, headless=False, browser_args=None, url=SUNO_CREATE_URL):
+    """Launch one long-lived browser with the Suno create page open
+
+    Returns (browser_session, cold_start_seconds). The session is kept alive
+    between agents, so it must be closed with close_suno_session().
+    """
+
+    started = time.perf_counter()
+
+    browser_session = BrowserSession(
+        browser_profile=BrowserProfile(
+            user_data_dir=profile_dir,
+            headless=headless,
+            args=browser_args or [],
+            keep_alive=True,
+            **budget_profile_kwargs()
+        )
+    )
+    await browser_session.start()
+
+    page = await browser_session.get_current_page()
+    if not page.url.startswith(url):
+        await page.goto(url)
+        await page.wait_for_load_state("domcontentloaded")
+
+    cold_start = time.perf_counter() - started
+    record_phase("browser_start", cold_start)
+    return browser_session, cold_start
+
+async def close_suno_session(browser_session):
+    """Close a session opened with open_suno_session()"""
+
+    if browser_session is not None:
+        await browser_session.kill()
+
+def print_step_timings(step_timings, cold_start=None):
+    """Print cold start versus per-step timings for a session"""
+
+    print("\n⏱️  Timings:")
+    if cold_start is not None:
+        print(f"   Cold start (browser + page load): {cold_start:.1f}s")
+    for step, seconds in step_timings.items():
+        print(f"   {step}: {seconds:.1f}s")
+
+    launches = len(BROWSER_STEPS & step_timings.keys())
+    if cold_start is not None and launches > 1:
+        # Without reuse every browser step after the first would pay the cold start again
+        saved = cold_start * (launches - 1)
+        print(f"   Saved by reusing the session: ~{saved:.1f}s")
@@ -0,0 +1,198 @@
+# tracing.py
+import argparse
+import contextvars
+import functools
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+TRACE_PATH = Path(os.getenv("SUNO_TRACE_FILE", str(Path.home() / ".suno_traces.jsonl")))
+
+COUNTERS = ("llm_calls", "llm_cache_hits", "llm_seconds", "prompt_tokens", "completion_tokens", "actions", "steps")
+
+# Process-wide labels stamped on every span (e.g. prompt_budget), for before/after comparisons
+SPAN_TAGS = {}
+
+_current_flow = contextvars.ContextVar("suno_trace_flow", default=None)
+
+class FlowTrace:
+    """Counters for one run of a flow, plus the step currently in progress"""
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.totals = dict.fromkeys(COUNTERS, 0)
+        self.phases = {}
+        self.step = None
+
+    def add(self, **counts):
+        for target in (self.totals, self.step):
+            if target is None:
+                continue
+            for key, value in counts.items():
+                target[key] = target.get(key, 0) + value
+
+def emit(span, path=None):
+    """Append one span to the JSONL trace file"""
+
+    with open(path or TRACE_PATH, "a") as f:
+        f.write(json.dumps({**span, **SPAN_TAGS}) + "\n")
+
+def record_llm_call(seconds, usage=None, cached=False):
+    """Count an LLM round-trip against the current flow and step"""
+
+    flow = _current_flow.get()
+    if flow is None:
+        return
+    if cached:
+        flow.add(llm_cache_hits=1)
+        return
+    flow.add(
+        llm_calls=1,
+        llm_seconds=seconds,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0
+    )
+
+def record_phase(name, seconds):
+    """Record a timed non-agent phase (browser startup, page load, ...) in the current flow"""
+
+    flow = _current_flow.get()
+    if flow is None:
+        return
+    flow.phases[name] = flow.phases.get(name, 0) + seconds
+    emit({"type": "phase", "flow": flow.name, "run_id": flow.run_id, "phase": name,
+          "wall_seconds": round(seconds, 3), "time": time.time()})
+
+def traced(name):
+    """Decorator: trace an async flow and emit a span with its totals when it ends"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            parent = _current_flow.get()
+            flow = FlowTrace(name, parent)
+            token = _current_flow.set(flow)
+            started = time.perf_counter()
+            status = "ok"
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException as e:
+                status = f"error: {type(e).__name__}"
+                raise
+            finally:
+                _current_flow.reset(token)
+                span = {
+                    "type": "flow",
+                    "flow": name,
+                    "run_id": flow.run_id,
+                    "parent_run_id": parent.run_id if parent else None,
+                    "status": status,
+                    "time": flow.started,
+                    "wall_seconds": round(time.perf_counter() - started, 3),
+                    "phases": {key: round(value, 3) for key, value in flow.phases.items()},
+                    **{key: round(value, 3) if isinstance(value, float) else value
+                       for key, value in flow.totals.items()}
+                }
+                emit(span)
+                if parent is not None:
+                    parent.add(**flow.totals)
+        return wrapper
+    return decorator
+
+async def _on_step_start(agent):
+    flow = _current_flow.get()
+    if flow is not None:
+        flow.step = dict.fromkeys(COUNTERS, 0)
+        flow.step["started"] = time.perf_counter()
+
+async def _on_step_end(agent):
+    flow = _current_flow.get()
+    if flow is None or flow.step is None:
+        return
+
+    model_output = agent.state.last_model_output
+    actions = len(model_output.action) if model_output and model_output.action else 0
+    flow.add(actions=actions, steps=1)
+
+    step = flow.step
+    flow.step = None
+    emit({
+        "type": "step",
+        "flow": flow.name,
+        "run_id": flow.run_id,
+        "step": agent.state.n_steps,
+        "wall_seconds": round(time.perf_counter() - step.pop("started"), 3),
+        "time": time.time(),
+        **{key: round(value, 3) if isinstance(value, float) else value for key, value in step.items()}
+    })
+
+async def run_traced(agent, **run_kwargs):
+    """agent.run() with per-step spans for the current flow"""
+
+    return await agent.run(on_step_start=_on_step_start, on_step_end=_on_step_end, **run_kwargs)
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(path=None, by=None):
+    """Aggregate flow spans into per-flow p50/p95 stats, optionally split by a span tag"""
+
+    flows = {}
+    with open(path or TRACE_PATH) as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if span.get("type") == "flow":
+                name = f"{span['flow']} [{by}={span.get(by)}]" if by else span["flow"]
+                flows.setdefault(name, []).append(span)
+
+    summary = {}
+    for name, spans in flows.items():
+        wall = [span["wall_seconds"] for span in spans]
+        summary[name] = {
+            "runs": len(spans),
+            "errors": sum(span["status"] != "ok" for span in spans),
+            "p50_seconds": _percentile(wall, 0.5),
+            "p95_seconds": _percentile(wall, 0.95),
+            "p50_llm_seconds": _percentile([span["llm_seconds"] for span in spans], 0.5),
+            "avg_llm_calls": sum(span["llm_calls"] for span in spans) / len(spans),
+            "avg_tokens": sum(span["prompt_tokens"] + span["completion_tokens"] for span in spans) / len(spans),
+            "avg_actions": sum(span["actions"] for span in spans) / len(spans),
+            "tokens_per_step": sum(span["prompt_tokens"] + span["completion_tokens"] for span in spans)
+                / max(1, sum(span["steps"] for span in spans))
+        }
+    return summary
+
+def print_summary(summary):
+    print(f"{'flow':<36} {'runs':>5} {'err':>4} {'p50 s':>8} {'p95 s':>8} {'llm p50':>8} {'calls':>6} "
+          f"{'tokens':>8} {'tok/step':>8} {'actions':>7}")
+    for name, stats in sorted(summary.items()):
+        print(
+            f"{name:<36} {stats['runs']:>5} {stats['errors']:>4} {stats['p50_seconds']:>8.1f} "
+            f"{stats['p95_seconds']:>8.1f} {stats['p50_llm_seconds']:>8.1f} {stats['avg_llm_calls']:>6.1f} "
+            f"{stats['avg_tokens']:>8.0f} {stats['tokens_per_step']:>8.0f} {stats['avg_actions']:>7.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Suno flow traces")
+    parser.add_argument("command", choices=["summary"])
+    parser.add_argument("--file", default=str(TRACE_PATH))
+    parser.add_argument("--by", help="split each flow by this span tag, e.g. prompt_budget")
+    args = parser.parse_args()
+
+    if not Path(args.file).exists():
+        print(f"❌ No traces at {args.file}")
+        return
+    print_summary(summarize(args.file, args.by))
+
+if __name__ == "__main__":
+    main()
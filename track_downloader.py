@@ -0,0 +1,157 @@
+# track_downloader.py
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+import httpx
+from fake_audio import file_sha256
+
+ARCHIVE_DIR = Path.home() / "suno_archive"
+
+# Finished audio on the page: players and direct links to Suno's CDN
+AUDIO_URLS_SCRIPT = """
+() => {
+    const urls = new Set();
+    document.querySelectorAll('audio[src], audio source[src]').forEach(el => urls.add(el.src));
+    document.querySelectorAll('a[href]').forEach(a => {
+        if (/\\.(mp3|m4a|wav)(\\?|$)/.test(a.href)) urls.add(a.href);
+    });
+    return Array.from(urls).filter(url => url.startsWith('http'));
+}
+"""
+
+async def collect_audio_urls(browser_session, clips=None):
+    """(clip, url) pairs to download: from finished clip metadata, else from the page
+
+    Clips without an audio_url (e.g. found by the waiter's DOM probe) get the
+    page's audio URL carrying their song id, as Suno's CDN names files by it.
+    """
+
+    pairs = [(clip, clip["audio_url"]) for clip in clips or [] if clip.get("audio_url")]
+    missing = [clip for clip in clips or [] if not clip.get("audio_url")]
+    if clips and not missing:
+        return pairs
+
+    page = await browser_session.get_current_page()
+    urls = await page.evaluate(AUDIO_URLS_SCRIPT)
+    if not clips:
+        return [({"id": None, "title": None}, url) for url in urls]
+
+    for clip in missing:
+        url = next((url for url in urls if clip.get("id") and clip["id"] in url), None)
+        if url:
+            pairs.append((clip, url))
+        else:
+            print(f"⚠️ No audio URL found on the page for clip {clip.get('id')}")
+    return pairs
+
+async def _session_client(browser_session, max_connections):
+    """httpx client carrying the browser context's cookies and user agent"""
+
+    cookies = httpx.Cookies()
+    for cookie in await browser_session.browser_context.cookies():
+        cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie.get("path", "/"))
+
+    page = await browser_session.get_current_page()
+    user_agent = await page.evaluate("() => navigator.userAgent")
+
+    return httpx.AsyncClient(
+        cookies=cookies,
+        headers={"User-Agent": user_agent},
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=max_connections),
+        timeout=httpx.Timeout(60.0, connect=10.0)
+    )
+
+def _file_name(clip, url):
+    extension = Path(url.split("?")[0]).suffix or ".mp3"
+    name = clip.get("title") or clip.get("id") or Path(url.split("?")[0]).stem
+    safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_")[:80] or "track"
+    suffix = f"-{clip['id'][:8]}" if clip.get("id") else ""
+    return f"{safe_name}{suffix}{extension}"
+
+async def _download(client, semaphore, url, path):
+    """Stream url to path via a temp file, hashing as it goes"""
+
+    tmp_path = path.with_name(f".{path.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+
+    async with semaphore:
+        try:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(1 << 16):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    return digest.hexdigest(), size
+
+def append_manifest(archive_dir, records):
+    with open(Path(archive_dir) / "manifest.jsonl", "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+async def download_tracks(browser_session, clips=None, prompt=None, input_clip=None,
+                          archive_dir=ARCHIVE_DIR, concurrency=4, manifest=True):
+    """Download finished tracks concurrently and record them in the archive manifest
+
+    The manifest links each output file and its hash to the input clip and
+    the extension prompt that produced it. Callers that still move or
+    annotate the files pass manifest=False and append the records themselves.
+    """
+
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+
+    targets = await collect_audio_urls(browser_session, clips)
+    if not targets:
+        print("⚠️ No finished audio found to download")
+        return []
+
+    input_sha256 = file_sha256(input_clip) if input_clip else None
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    client = await _session_client(browser_session, concurrency)
+    async with client:
+        paths = [archive_dir / _file_name(clip, url) for clip, url in targets]
+        results = await asyncio.gather(
+            *[_download(client, semaphore, url, path) for (clip, url), path in zip(targets, paths)],
+            return_exceptions=True
+        )
+
+    records = []
+    for (clip, url), path, result in zip(targets, paths, results):
+        if isinstance(result, Exception):
+            print(f"❌ Download failed for {url}: {type(result).__name__}: {result}")
+            continue
+        sha256, size = result
+        records.append({
+            "clip_id": clip.get("id"),
+            "title": clip.get("title"),
+            "url": url,
+            "file": str(path),
+            "sha256": sha256,
+            "bytes": size,
+            "prompt": prompt,
+            "input_clip": str(input_clip) if input_clip else None,
+            "input_sha256": input_sha256,
+            "downloaded_at": time.time()
+        })
+
+    if manifest:
+        append_manifest(archive_dir, records)
+    elapsed = time.perf_counter() - started
+    total = sum(record["bytes"] for record in records)
+    print(f"💾 Downloaded {len(records)}/{len(targets)} track(s), {total / 1e6:.1f}MB in {elapsed:.1f}s → {archive_dir}")
+    return records
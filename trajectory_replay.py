@@ -0,0 +1,140 @@
+# trajectory_replay.py
+import hashlib
+import time
+from importlib.metadata import version
+from pathlib import Path
+from urllib.parse import urlparse
+from browser_use import AgentHistoryList
+from browser_use.agent.views import AgentHistory
+from browser_use.browser.views import BrowserStateHistory
+from tracing import run_traced
+
+TRAJECTORY_DIR = Path.home() / ".suno_trajectories"
+
+# Replay drives Agent._execute_history_step, a private method; this is the release it was written against
+REPLAY_BROWSER_USE_VERSION = "0.5.5"
+
+def trajectory_path(task, start_url, trajectory_dir=TRAJECTORY_DIR):
+    """Trajectory file for a task string started from a given URL"""
+
+    parsed = urlparse(start_url or "about:blank")
+    key = hashlib.sha256(f"{task.strip()}\n{parsed.netloc}{parsed.path}".encode()).hexdigest()[:24]
+    return Path(trajectory_dir) / f"{key}.json"
+
+def _same_page(current_url, recorded_url):
+    if not recorded_url:
+        return True
+    current, recorded = urlparse(current_url), urlparse(recorded_url)
+    return (current.netloc, current.path.rstrip("/")) == (recorded.netloc, recorded.path.rstrip("/"))
+
+async def _execute_recorded_step(agent, history_item, delay_between_actions):
+    execute = getattr(agent, "_execute_history_step", None)
+    if execute is None:
+        raise RuntimeError(
+            f"browser-use {version('browser-use')} has no Agent._execute_history_step; trajectory replay "
+            f"needs browser-use {REPLAY_BROWSER_USE_VERSION}"
+        )
+    return await execute(history_item, delay_between_actions)
+
+async def replay_trajectory(agent, history, delay_between_actions=0.5):
+    """Execute recorded actions directly, returns (completed, replayed_history)
+
+    Before each step the current page must match the page the step was
+    recorded on and every element it touched must still be found; otherwise
+    replay stops so the caller can hand control back to the LLM. The
+    returned history holds what this run did: the replayed actions with
+    their new results and the pages they ran on.
+    """
+
+    replayed = AgentHistoryList(history=[])
+    for i, history_item in enumerate(history.history):
+        model_output = history_item.model_output
+        if not model_output or not model_output.action or model_output.action == [None]:
+            continue
+
+        page = await agent.browser_session.get_current_page()
+        if not _same_page(page.url, history_item.state.url):
+            print(f"↪️  Replay diverged at step {i + 1}: on {page.url}, expected {history_item.state.url}")
+            return False, replayed
+
+        try:
+            results = await _execute_recorded_step(agent, history_item, delay_between_actions)
+        except RuntimeError:
+            raise
+        except Exception as e:
+            print(f"↪️  Replay diverged at step {i + 1}: {e}")
+            return False, replayed
+
+        replayed.history.append(AgentHistory(
+            model_output=model_output,
+            result=results,
+            state=BrowserStateHistory(
+                url=page.url,
+                title=await page.title(),
+                tabs=[],
+                interacted_element=history_item.state.interacted_element
+            )
+        ))
+        if any(result.error for result in results):
+            print(f"↪️  Replay step {i + 1} failed, handing back to the agent")
+            return False, replayed
+        if any(result.is_done for result in results):
+            return True, replayed
+
+    return history.is_done() and replayed.is_done(), replayed
+
+async def _replay_saved(agent, path):
+    """Replay the saved trajectory at path; returns this run's history when it completed, else None"""
+
+    started = time.perf_counter()
+    try:
+        history = AgentHistoryList.load_from_file(path, agent.AgentOutput)
+    except Exception as e:
+        print(f"⚠️ Could not load trajectory {path.name}: {e}")
+        return None
+
+    try:
+        completed, replayed = await replay_trajectory(agent, history)
+    except RuntimeError as e:
+        print(f"⚠️ Replay unavailable: {e}")
+        return None
+
+    steps = len(replayed.history)
+    if completed:
+        print(f"⏩ Replayed {steps} recorded step(s) in {time.perf_counter() - started:.1f}s with no LLM calls")
+        return replayed
+    print(f"🧠 Handing back to the LLM after {steps} replayed step(s)")
+    return None
+
+async def run_with_replay(agent, replay=True, trajectory_dir=TRAJECTORY_DIR, max_steps=100):
+    """Run an agent, replaying its recorded trajectory first when one exists
+
+    Every successful LLM run is saved as the trajectory for its task and
+    starting URL, so the next identical run can skip the model entirely.
+    The agent is closed afterwards; a shared keep-alive session stays open.
+    """
+
+    handed_to_agent = False
+    try:
+        await agent.browser_session.start()
+        page = await agent.browser_session.get_current_page()
+        path = trajectory_path(agent.task, page.url, trajectory_dir)
+
+        if replay and path.exists():
+            replayed = await _replay_saved(agent, path)
+            if replayed is not None:
+                return replayed
+
+        # agent.run() closes the agent itself
+        handed_to_agent = True
+        result = await run_traced(agent, max_steps=max_steps)
+    finally:
+        if not handed_to_agent:
+            await agent.close()
+
+    if result.is_done() and result.is_successful() is not False:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        result.save_to_file(path)
+        print(f"💾 Saved trajectory: {path.name}")
+
+    return result
@@ -0,0 +1,107 @@
+# upload_cache.py
+import json
+import os
+import re
+import time
+from pathlib import Path
+from fake_audio import file_sha256
+
+UPLOAD_INDEX_PATH = Path.home() / ".suno_upload_index.json"
+SONG_ID_PATTERN = re.compile(r"/song/([0-9a-fA-F-]{36})")
+
+class UploadIndex:
+    """Local index from audio content hash to the Suno clip it was uploaded as"""
+
+    def __init__(self, path=UPLOAD_INDEX_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        self.stats = {"hits": 0, "misses": 0, "bytes_saved": 0}
+
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except (json.JSONDecodeError, OSError):
+                print(f"⚠️ Ignoring unreadable upload index: {self.path}")
+
+    def lookup(self, audio_path):
+        """Return (content_hash, entry or None) for an audio file"""
+
+        content_hash = file_sha256(audio_path)
+        entry = self.entries.get(content_hash)
+        self.stats["hits" if entry else "misses"] += 1
+        if entry:
+            self.stats["bytes_saved"] += entry.get("bytes") or 0
+        return content_hash, entry
+
+    def record(self, content_hash, clip_id, audio_path=None):
+        self.entries[content_hash] = {
+            "clip_id": clip_id,
+            "url": f"https://suno.com/song/{clip_id}",
+            "file": str(audio_path) if audio_path else None,
+            "bytes": os.path.getsize(audio_path) if audio_path else None,
+            "uploaded_at": time.time()
+        }
+        self.save()
+
+    def forget(self, content_hash):
+        if self.entries.pop(content_hash, None) is not None:
+            self.save()
+
+    def save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2))
+        os.replace(tmp_path, self.path)
+
+    def print_stats(self):
+        print(f"📦 Upload index: {self.stats['hits']} reused, {self.stats['misses']} new, "
+              f"{len(self.entries)} clip(s) indexed ({self.stats['bytes_saved'] / 1e6:.1f}MB of uploads skipped)")
+
+class UploadWatcher:
+    """Capture the clip id Suno assigns to an upload, from the page's upload API responses
+
+    Start it before the file is selected; clip_id stays None when no upload
+    response carrying a clip id was seen.
+    """
+
+    def __init__(self, browser_session):
+        self.browser_session = browser_session
+        self.page = None
+        self.clip_id = None
+
+    async def start(self):
+        self.page = await self.browser_session.get_current_page()
+        self.page.on("response", self._on_response)
+        return self
+
+    def stop(self):
+        if self.page is not None:
+            self.page.remove_listener("response", self._on_response)
+
+    async def _on_response(self, response):
+        if "/api/" not in response.url or "upload" not in response.url:
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        if isinstance(payload, dict) and payload.get("clip_id"):
+            self.clip_id = payload["clip_id"]
+
+def clip_id_from_history(history):
+    """Id of the clip an agent run ended on (usually the generated output, not an upload)
+
+    From its final result, else the latest song URL visited.
+    """
+
+    if not hasattr(history, "urls"):
+        return None
+
+    texts = [url for url in history.urls() if url]
+    texts.append(history.final_result() or "")
+    for text in reversed(texts):
+        match = SONG_ID_PATTERN.search(text)
+        if match:
+            return match.group(1)
+    return None
@@ -0,0 +1,128 @@
+# wav_synth.py
+import os
+import wave
+from pathlib import Path
+import numpy as np
+
+# Defaults reproduce the original 8-second A3 test tone
+DEFAULT_HARMONICS = (0.6, 0.3, 0.1)
+
+def synth_blocks(frequency=220, harmonics=DEFAULT_HARMONICS, decay=0.5, attack=0.0, duration=8,
+                 sample_rate=44100, channels=1, amplitude=1.0, block_size=65536):
+    """Yield 16-bit PCM blocks of a guitar-like tone, one fixed-size block at a time
+
+    harmonics are the weights of the fundamental and its overtones, decay is
+    the exponential envelope rate per second and attack a linear fade-in in
+    seconds. Memory stays at one block regardless of duration.
+    """
+
+    total_frames = int(sample_rate * duration)
+    overtones = np.arange(1, len(harmonics) + 1)[:, None]
+    weights = np.asarray(harmonics, dtype=np.float64)[:, None]
+    omega = 2 * np.pi * frequency * overtones
+
+    for start in range(0, total_frames, block_size):
+        frames = min(block_size, total_frames - start)
+        t = (start + np.arange(frames)) / sample_rate
+
+        signal = (weights * np.sin(omega * t)).sum(axis=0)
+        envelope = np.exp(-decay * t)
+        if attack > 0:
+            envelope *= np.minimum(t / attack, 1.0)
+
+        samples = np.clip(signal * envelope * amplitude, -1.0, 1.0)
+        pcm = (samples * 32767).astype('<i2')
+        if channels > 1:
+            pcm = np.repeat(pcm[:, None], channels, axis=1)
+
+        yield pcm.tobytes()
+
+def write_wav_blocks(path, blocks, sample_rate=44100, channels=1):
+    """Stream PCM blocks into a WAV file, written atomically"""
+
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+
+    with wave.open(str(tmp_path), 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        for block in blocks:
+            wav_file.writeframes(block)
+
+    os.replace(tmp_path, path)
+    return str(path)
+
+def synthesize_wav(path, sample_rate=44100, channels=1, **params):
+    """Write a synthesized tone to path; params are passed to synth_blocks()"""
+
+    blocks = synth_blocks(sample_rate=sample_rate, channels=channels, **params)
+    return write_wav_blocks(path, blocks, sample_rate, channels)
+
+def synthesize_corpus(out_dir, specs):
+    """Write one WAV per spec dict ("name" plus synthesize_wav parameters)"""
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for spec in specs:
+        params = dict(spec)
+        name = params.pop("name")
+        paths.append(synthesize_wav(out_dir / f"{name}.wav", **params))
+    return paths
+
+def progression_blocks(root=220, progression=((0, 4, 7),), tempo=100, beats_per_chord=4,
+                       harmonics=DEFAULT_HARMONICS, decay=3.0, noise=0.0, duration=8,
+                       sample_rate=44100, channels=1, amplitude=0.8, seed=0, block_size=65536):
+    """Yield 16-bit PCM blocks of a strummed chord progression
+
+    progression is a list of chords, each a tuple of semitone offsets from
+    root. Every beat re-strums the current chord with an exponential decay;
+    noise adds white noise at that level. Blocks are computed vectorized
+    across frames, voices and harmonics.
+    """
+
+    total_frames = int(sample_rate * duration)
+    beat_seconds = 60.0 / tempo
+    rng = np.random.default_rng(seed)
+
+    # Pad chords to the same number of voices; padded voices are silent
+    voices = max(len(chord) for chord in progression)
+    intervals = np.full((len(progression), voices), np.nan)
+    for i, chord in enumerate(progression):
+        intervals[i, :len(chord)] = chord
+    chord_freqs = np.nan_to_num(root * 2.0 ** (intervals / 12.0))
+    voice_counts = np.array([len(chord) for chord in progression], dtype=np.float64)
+
+    overtones = np.arange(1, len(harmonics) + 1)
+    weights = np.asarray(harmonics, dtype=np.float64)
+
+    for start in range(0, total_frames, block_size):
+        frames = min(block_size, total_frames - start)
+        t = (start + np.arange(frames)) / sample_rate
+
+        beat = np.floor(t / beat_seconds)
+        since_strum = t - beat * beat_seconds
+        chord_index = (beat // beats_per_chord).astype(np.int64) % len(progression)
+
+        # frames x voices x harmonics
+        freqs = chord_freqs[chord_index][:, :, None] * overtones
+        tones = (weights * np.sin(2 * np.pi * freqs * t[:, None, None])).sum(axis=(1, 2))
+        signal = tones / voice_counts[chord_index] * np.exp(-decay * since_strum)
+
+        if noise > 0:
+            signal += noise * rng.standard_normal(frames)
+
+        samples = np.clip(signal * amplitude, -1.0, 1.0)
+        pcm = (samples * 32767).astype('<i2')
+        if channels > 1:
+            pcm = np.repeat(pcm[:, None], channels, axis=1)
+
+        yield pcm.tobytes()
+
+def synthesize_progression_wav(path, sample_rate=44100, channels=1, **params):
+    """Write a synthesized chord progression to path; params go to progression_blocks()"""
+
+    blocks = progression_blocks(sample_rate=sample_rate, channels=channels, **params)
+    return write_wav_blocks(path, blocks, sample_rate, channels)